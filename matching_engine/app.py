@@ -1,13 +1,39 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from services.recommendation import RecommendationEngine
+from services.storage import MongoUserStore
 from services.elo import update_elo_ratings
-from database import users_collection, interactions_collection
+from services import pairwise
+from services import decks
+from database import users_collection, candidate_users_collection, interactions_collection, pool_stats
 from bson import ObjectId
 from datetime import datetime
 import config
 
 app = Flask(__name__)
-engine = RecommendationEngine()
+store = MongoUserStore(users_collection, candidate_users_collection)
+
+if config.PROFILE_SYNC_ENABLED:
+    # Serve candidates from memory, kept fresh by change streams (or polling)
+    # The watcher thread is started per worker on its first request (see ensure_watcher);
+    # until its snapshot is loaded the cache reads from Mongo.
+    from services.profile_cache import ProfileCache
+    from services import profile_sync
+
+    store = ProfileCache(backing_store=store)
+
+    @app.before_request
+    def start_profile_sync():
+        profile_sync.ensure_watcher(store)
+
+if config.FEATURE_SNAPSHOT_DIR:
+    # Rank from the memory-mapped snapshot shared by all worker processes
+    from services.feature_snapshot import SnapshotManager, SnapshotRecommendationEngine
+
+    engine = SnapshotRecommendationEngine(store, SnapshotManager(config.FEATURE_SNAPSHOT_DIR))
+else:
+    engine = RecommendationEngine(store)
+
+deck_store = decks.DeckStore()
 
 @app.route('/api/recommendations/', methods=['GET'])
 def get_recommendations():
@@ -19,22 +45,53 @@ def get_recommendations():
         recommendations = engine.get_recommendations(user_id)
         
         # Fetch full user objects for the recommended IDs
-        results = []
-        for rec in recommendations:
-            user = users_collection.find_one({'_id': ObjectId(rec['id'])})
-            if user:
-                results.append({
-                    '_id': str(user['_id']),
-                    'displayName': user.get('displayName'),
-                    'age': user.get('age'),
-                    'photos': user.get('photos', []),
-                    'match_score': round(rec['match_score'] * 100, 1)
-                })
+        results = engine.hydrate(recommendations)
                 
         return jsonify(results)
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/api/recommendations/deck/', methods=['GET'])
+def get_recommendation_deck():
+    try:
+        user_id = request.args.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        limit = min(int(request.args.get('limit', config.DECK_PAGE_SIZE)), config.DECK_SIZE)
+        page = decks.get_deck_page(engine, deck_store, user_id, request.args.get('cursor'), limit)
+        return jsonify(page)
+    except decks.ExpiredCursor as e:
+        return jsonify({'error': str(e)}), 410
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scores/', methods=['POST'])
+def score_pairs():
+    try:
+        user_ids, candidate_ids, stream = pairwise.parse_request(request.get_json(silent=True))
+    except pairwise.PairwiseRequestError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        users, candidates = pairwise.load_profiles(engine.store, user_ids, candidate_ids)
+        if not users:
+            return jsonify({'error': 'User not found'}), 404
+
+        blocks = engine.score_pairs(users, candidates)
+        if not stream:
+            user_id, scores = next(blocks)[0]
+            return jsonify(pairwise.to_payload(user_id, scores))
+
+        return Response(
+            stream_with_context(pairwise.to_ndjson(block) for block in blocks),
+            mimetype='application/x-ndjson'
+        )
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/api/interaction/', methods=['POST'])
 def record_interaction():
     try:
@@ -57,10 +114,10 @@ def record_interaction():
         # Update ELO if it's a LIKE or PASS
         if action in ['LIKE', 'SUPERLIKE']:
             # Target gains ELO (is desirable)
-            update_elo_ratings(target_id, actor_id)
+            update_elo_ratings(target_id, actor_id, store=engine.store)
         elif action == 'PASS':
             # Target loses ELO (is less desirable)
-            update_elo_ratings(actor_id, target_id)
+            update_elo_ratings(actor_id, target_id, store=engine.store)
         
         return jsonify({'status': 'success', 'message': 'Interaction recorded'})
             
@@ -71,5 +128,34 @@ def record_interaction():
 def health_check():
     return jsonify({'status': 'healthy', 'service': 'matching-engine'})
 
+@app.route('/health/pool', methods=['GET'])
+def pool_health():
+    return jsonify(pool_stats())
+
+@app.route('/health/snapshot', methods=['GET'])
+def snapshot_health():
+    if not config.FEATURE_SNAPSHOT_DIR:
+        return jsonify({'enabled': False})
+    engine.snapshots.current()
+    return jsonify(dict(engine.snapshots.stats(), enabled=True))
+
+@app.route('/health/feature-cache', methods=['GET'])
+def feature_cache_health():
+    if engine.feature_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(engine.feature_cache.stats(), enabled=True))
+
+@app.route('/health/profile-sync', methods=['GET'])
+def profile_sync_health():
+    if not config.PROFILE_SYNC_ENABLED:
+        return jsonify({'enabled': False})
+    watcher = profile_sync.current_watcher()
+    return jsonify(dict(
+        store.stats(),
+        enabled=True,
+        mode=watcher.mode if watcher else None,
+        alive=watcher.is_alive() if watcher else False
+    ))
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
@@ -0,0 +1,117 @@
+"""
+Async (ASGI) serving mode for the matching engine.
+
+Same routes and payloads as app.py, backed by Motor instead of PyMongo.
+Run with: hypercorn asgi:app --bind 0.0.0.0:8000
+"""
+import asyncio
+from quart import Quart, Response, request, jsonify
+from services.async_recommendation import AsyncRecommendationEngine
+from services.async_storage import AsyncMongoUserStore
+from services.elo import update_elo_ratings_async
+from services import pairwise
+from async_database import users_collection, candidate_users_collection, interactions_collection, pool_stats
+from bson import ObjectId
+from datetime import datetime
+import config
+
+app = Quart(__name__)
+engine = AsyncRecommendationEngine(AsyncMongoUserStore(users_collection, candidate_users_collection))
+
+@app.route('/api/recommendations/', methods=['GET'])
+async def get_recommendations():
+    try:
+        user_id = request.args.get('user_id')
+        if not user_id:
+            return jsonify({'error': 'user_id is required'}), 400
+
+        recommendations = await engine.get_recommendations(user_id)
+
+        # Fetch full user objects for the recommended IDs
+        results = await engine.hydrate(recommendations)
+
+        return jsonify(results)
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/scores/', methods=['POST'])
+async def score_pairs():
+    try:
+        user_ids, candidate_ids, stream = pairwise.parse_request(await request.get_json(silent=True))
+    except pairwise.PairwiseRequestError as e:
+        return jsonify({'error': str(e)}), 400
+
+    try:
+        users, candidates = await pairwise.load_profiles_async(engine.store, user_ids, candidate_ids)
+        if not users:
+            return jsonify({'error': 'User not found'}), 404
+
+        loop = asyncio.get_running_loop()
+        blocks = engine.score_pairs(users, candidates)
+
+        async def next_block():
+            # Each matrix block is CPU-bound, so compute it off the event loop
+            return await loop.run_in_executor(engine.executor, next, blocks, None)
+
+        if not stream:
+            user_id, scores = (await next_block())[0]
+            return jsonify(pairwise.to_payload(user_id, scores))
+
+        async def generate():
+            while (block := await next_block()) is not None:
+                yield pairwise.to_ndjson(block)
+
+        return Response(generate(), mimetype='application/x-ndjson')
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/interaction/', methods=['POST'])
+async def record_interaction():
+    try:
+        data = await request.get_json()
+        actor_id = data.get('actor_id')
+        target_id = data.get('target_id')
+        action = data.get('action')  # LIKE, PASS, SUPERLIKE
+
+        if not all([actor_id, target_id, action]):
+            return jsonify({'error': 'Missing required fields'}), 400
+
+        # Record interaction
+        insert = interactions_collection.insert_one({
+            'actor_id': ObjectId(actor_id),
+            'target_id': ObjectId(target_id),
+            'action_type': action,
+            'timestamp': datetime.utcnow()
+        })
+
+        # Update ELO if it's a LIKE or PASS (independent of the insert, so run both together)
+        if action in ['LIKE', 'SUPERLIKE']:
+            # Target gains ELO (is desirable)
+            await asyncio.gather(insert, update_elo_ratings_async(target_id, actor_id, engine.store))
+        elif action == 'PASS':
+            # Target loses ELO (is less desirable)
+            await asyncio.gather(insert, update_elo_ratings_async(actor_id, target_id, engine.store))
+        else:
+            await insert
+
+        return jsonify({'status': 'success', 'message': 'Interaction recorded'})
+
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/health', methods=['GET'])
+async def health_check():
+    return jsonify({'status': 'healthy', 'service': 'matching-engine'})
+
+@app.route('/health/pool', methods=['GET'])
+async def pool_health():
+    return jsonify(pool_stats())
+
+@app.route('/health/feature-cache', methods=['GET'])
+async def feature_cache_health():
+    if engine.feature_cache is None:
+        return jsonify({'enabled': False})
+    return jsonify(dict(engine.feature_cache.stats(), enabled=True))
+
+if __name__ == '__main__':
+    app.run(host='0.0.0.0', port=config.PORT, debug=config.DEBUG)
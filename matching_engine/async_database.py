@@ -0,0 +1,62 @@
+"""
+Motor (asyncio) connection layer for the ASGI app.
+
+Like database.py, the client is created lazily on first use and re-created
+in a forked child process, with the same pool/timeout/compression settings
+and per-query-class read preferences.
+"""
+import os
+import threading
+from motor.motor_asyncio import AsyncIOMotorClient
+from config import MONGODB_URI
+from database import LazyCollection, PoolStatsListener, client_options, read_preference
+
+_lock = threading.Lock()
+_state = {'pid': None, 'client': None, 'listener': None, 'collections': {}}
+
+
+def get_client():
+    """
+    Return this process's AsyncIOMotorClient, creating it on first use (or after fork).
+    """
+    pid = os.getpid()
+    if _state['pid'] != pid:
+        with _lock:
+            if _state['pid'] != pid:
+                listener = PoolStatsListener()
+                _state.update(
+                    client=AsyncIOMotorClient(MONGODB_URI, **client_options(listener)),
+                    listener=listener,
+                    collections={},
+                    pid=pid
+                )
+    return _state['client']
+
+
+def get_collection(name, query_class='default'):
+    client = get_client()
+    key = (name, query_class)
+    collection = _state['collections'].get(key)
+    if collection is None:
+        collection = client.get_database().get_collection(name, read_preference=read_preference(query_class))
+        _state['collections'][key] = collection
+    return collection
+
+
+def pool_stats():
+    stats = {'pid': os.getpid(), 'connected': _state['pid'] == os.getpid()}
+    if stats['connected']:
+        stats.update(_state['listener'].snapshot())
+    stats['settings'] = client_options()
+    return stats
+
+
+class AsyncLazyCollection(LazyCollection):
+    def __getattr__(self, attr):
+        return getattr(get_collection(self._name, self._query_class), attr)
+
+
+# Collections
+users_collection = AsyncLazyCollection('users')
+candidate_users_collection = AsyncLazyCollection('users', 'candidates')
+interactions_collection = AsyncLazyCollection('interactions')
@@ -0,0 +1,105 @@
+"""
+Closed-loop HTTP benchmark for the matching engine serving modes.
+
+Start either server, then point this at it, e.g.
+
+    python app.py                                   # sync Flask
+    hypercorn asgi:app --bind 0.0.0.0:8000          # async ASGI
+    python benchmarks/serving.py --user-id <id> --concurrency 32 --requests 2000
+
+Only the standard library is used so the same script measures both modes.
+"""
+import argparse
+import json
+import statistics
+import threading
+import time
+import urllib.request
+
+
+def _percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+def run(url, concurrency, total_requests, method='GET', body=None):
+    latencies = []
+    errors = 0
+    lock = threading.Lock()
+    remaining = [total_requests]
+
+    data = json.dumps(body).encode() if body is not None else None
+    headers = {'Content-Type': 'application/json'} if data else {}
+
+    def worker():
+        nonlocal errors
+        while True:
+            with lock:
+                if remaining[0] <= 0:
+                    return
+                remaining[0] -= 1
+
+            req = urllib.request.Request(url, data=data, headers=headers, method=method)
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except Exception:
+                ok = False
+            elapsed = time.perf_counter() - start
+
+            with lock:
+                latencies.append(elapsed)
+                if not ok:
+                    errors += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'concurrency': concurrency,
+        'throughput_rps': round(len(latencies) / wall, 1) if wall else 0.0,
+        'mean_ms': round(statistics.mean(latencies) * 1000, 2) if latencies else 0.0,
+        'p50_ms': round(_percentile(latencies, 50) * 1000, 2),
+        'p95_ms': round(_percentile(latencies, 95) * 1000, 2),
+        'p99_ms': round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--user-id', required=True, help='user to request recommendations for')
+    parser.add_argument('--target-id', help='if set, also benchmark POST /api/interaction/ (PASS)')
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--requests', type=int, default=1000)
+    args = parser.parse_args()
+
+    results = {
+        'recommendations': run(
+            f"{args.base_url}/api/recommendations/?user_id={args.user_id}",
+            args.concurrency, args.requests
+        )
+    }
+    if args.target_id:
+        results['interaction'] = run(
+            f"{args.base_url}/api/interaction/", args.concurrency, args.requests, method='POST',
+            body={'actor_id': args.user_id, 'target_id': args.target_id, 'action': 'PASS'}
+        )
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+"""
+Offline stage: precompute recommendation decks for recently active users.
+
+    python build_decks.py                       # users active in the last DECK_ACTIVE_DAYS
+    python build_decks.py --days 1 --workers 8
+
+Every active user is ranked against every onboarded user (not just the
+CANDIDATE_LIMIT window used live), in blocks of DECK_BLOCK_SIZE users spread
+over a process pool. Decks are written as each block finishes.
+"""
+import argparse
+import time
+from datetime import datetime, timedelta
+import config
+from database import get_collection
+from services.decks import DeckStore, deck_version, rank_decks
+from services.storage import PROFILE_FIELDS
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--days', type=float, default=config.DECK_ACTIVE_DAYS)
+    parser.add_argument('--workers', type=int, default=config.DECK_WORKERS)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    projection = {field: 1 for field in PROFILE_FIELDS}
+    users = get_collection('users', 'candidates')
+
+    since = datetime.utcnow() - timedelta(days=args.days)
+    targets = list(users.find({'lastActive': {'$gte': since}}, projection).sort('lastActive', -1))
+    candidates = list(users.find({'onboardingCompleted': True}, projection))
+    print(f"Ranking {len(targets)} active users against {len(candidates)} candidates")
+
+    if not targets or not candidates:
+        return
+
+    deck_store = DeckStore()
+    version = deck_version()
+    written = 0
+    for decks in rank_decks(targets, candidates, workers=args.workers):
+        deck_store.save(decks, source='batch', version=version)
+        written += len(decks)
+        print(f"  {written}/{len(targets)} decks written")
+
+    print(f"Deck version {version} built in {time.perf_counter() - started:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
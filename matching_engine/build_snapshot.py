@@ -0,0 +1,42 @@
+"""
+Build and publish the shared feature snapshot (see services/feature_snapshot.py).
+
+    python build_snapshot.py                 # build once
+    python build_snapshot.py --every 300     # rebuild every 5 minutes
+"""
+import argparse
+import time
+import config
+from database import get_collection
+from services.feature_snapshot import build_snapshot
+from services.storage import PROFILE_FIELDS
+
+SNAPSHOT_FIELDS = PROFILE_FIELDS + ('onboardingCompleted',)
+
+
+def build_once(root):
+    started = time.perf_counter()
+    users = get_collection('users', 'candidates').find({}, {field: 1 for field in SNAPSHOT_FIELDS})
+    version = build_snapshot(users, root)
+    print(f"Published {version} in {time.perf_counter() - started:.1f}s")
+    return version
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--root', default=config.FEATURE_SNAPSHOT_DIR)
+    parser.add_argument('--every', type=float, default=0, help='rebuild interval in seconds (0 = once)')
+    args = parser.parse_args()
+
+    if not args.root:
+        parser.error('--root or FEATURE_SNAPSHOT_DIR is required')
+
+    while True:
+        build_once(args.root)
+        if not args.every:
+            break
+        time.sleep(args.every)
+
+
+if __name__ == '__main__':
+    main()
@@ -6,3 +6,60 @@ load_dotenv()
 MONGODB_URI = os.getenv('MONGODB_URI', 'mongodb://localhost:27017/sugar_dating_app')
 PORT = int(os.getenv('PORT', 8000))
 DEBUG = os.getenv('DEBUG', 'True') == 'True'
+
+# Upper bound on candidates loaded per recommendation request
+CANDIDATE_LIMIT = int(os.getenv('CANDIDATE_LIMIT', 100))
+
+# Threads used by the ASGI app to run CPU-bound scoring off the event loop
+SCORING_WORKERS = int(os.getenv('SCORING_WORKERS', os.cpu_count() or 1))
+
+# MongoDB connection pool (unset values fall back to the PyMongo defaults)
+def _optional_int(name):
+    value = os.getenv(name)
+    return int(value) if value not in (None, '') else None
+
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+MONGO_MAX_IDLE_TIME_MS = _optional_int('MONGO_MAX_IDLE_TIME_MS')
+MONGO_WAIT_QUEUE_TIMEOUT_MS = _optional_int('MONGO_WAIT_QUEUE_TIMEOUT_MS')
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 20000))
+MONGO_SOCKET_TIMEOUT_MS = _optional_int('MONGO_SOCKET_TIMEOUT_MS')
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000))
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')  # e.g. "zstd,snappy,zlib"
+
+# Read preference per query class (primary, primaryPreferred, secondary, secondaryPreferred, nearest).
+# ELO read-modify-write always goes to the primary.
+MONGO_READ_PREFERENCE_DEFAULT = os.getenv('MONGO_READ_PREFERENCE_DEFAULT', 'primary')
+MONGO_READ_PREFERENCE_CANDIDATES = os.getenv('MONGO_READ_PREFERENCE_CANDIDATES', 'primary')
+
+# Bulk pairwise scoring (/api/scores/)
+PAIRWISE_MAX_IDS = int(os.getenv('PAIRWISE_MAX_IDS', 5000))
+PAIRWISE_BLOCK_SIZE = int(os.getenv('PAIRWISE_BLOCK_SIZE', 256))
+
+# In-memory profile cache kept fresh from change streams (polling on standalone mongod).
+# One copy per worker process: every user's ranking/display fields, plus all
+# interactions when EXCLUDE_SEEN_CANDIDATES is on.
+PROFILE_SYNC_ENABLED = os.getenv('PROFILE_SYNC_ENABLED', 'False') == 'True'
+PROFILE_SYNC_POLL_INTERVAL = float(os.getenv('PROFILE_SYNC_POLL_INTERVAL', 5))
+# Leave out users the requester has already liked/passed (in-memory cache only;
+# also makes the cache preload and follow the interactions collection)
+EXCLUDE_SEEN_CANDIDATES = os.getenv('EXCLUDE_SEEN_CANDIDATES', 'False') == 'True'
+
+# Shared memory-mapped feature snapshot (build with build_snapshot.py); empty = rank live
+FEATURE_SNAPSHOT_DIR = os.getenv('FEATURE_SNAPSHOT_DIR', '')
+FEATURE_SNAPSHOT_REFRESH = float(os.getenv('FEATURE_SNAPSHOT_REFRESH', 10))
+FEATURE_SNAPSHOT_KEEP = int(os.getenv('FEATURE_SNAPSHOT_KEEP', 3))
+
+# Precomputed recommendation decks (build_decks.py, /api/recommendations/deck/)
+DECK_SIZE = int(os.getenv('DECK_SIZE', 500))
+DECK_ACTIVE_DAYS = float(os.getenv('DECK_ACTIVE_DAYS', 7))
+DECK_BLOCK_SIZE = int(os.getenv('DECK_BLOCK_SIZE', 64))
+DECK_WORKERS = int(os.getenv('DECK_WORKERS', os.cpu_count() or 1))
+DECK_PAGE_SIZE = int(os.getenv('DECK_PAGE_SIZE', 20))
+# Decks older than this (the batch cadence) are treated as missing and rebuilt live
+DECK_MAX_AGE_HOURS = float(os.getenv('DECK_MAX_AGE_HOURS', 24))
+
+# Per-profile hashed term counts keyed by profile content hash (live ranking path)
+FEATURE_CACHE_ENABLED = os.getenv('FEATURE_CACHE_ENABLED', 'True') == 'True'
+FEATURE_CACHE_MAX_ENTRIES = int(os.getenv('FEATURE_CACHE_MAX_ENTRIES', 200000))
+FEATURE_CACHE_N_FEATURES = int(os.getenv('FEATURE_CACHE_N_FEATURES', 2 ** 20))
@@ -0,0 +1,29 @@
+"""
+Djongo backed UserStore for the Django app.
+"""
+from services.storage import UserStore, PROFILE_FIELDS
+import config
+from ..models import User
+
+
+class DjongoUserStore(UserStore):
+    def _values(self, queryset, fields):
+        return queryset.values('_id', *fields)
+
+    def get_user(self, user_id):
+        return self._values(User.objects.filter(pk=user_id), PROFILE_FIELDS).first()
+
+    def get_candidates(self, user_id, limit=None):
+        limit = config.CANDIDATE_LIMIT if limit is None else limit
+        # Bounded scan: never materialise the full users collection
+        queryset = User.objects.exclude(pk=user_id).filter(onboardingCompleted=True)
+        return list(self._values(queryset, PROFILE_FIELDS)[:limit])
+
+    def get_users(self, user_ids, fields=PROFILE_FIELDS):
+        if not user_ids:
+            return []
+        return list(self._values(User.objects.filter(pk__in=list(user_ids)), fields))
+
+    def set_elo_scores(self, scores):
+        for user_id, elo in scores.items():
+            User.objects.filter(pk=user_id).update(elo_score=int(elo))
@@ -21,16 +21,7 @@ class RecommendationView(APIView):
             
             # Fetch full user objects for the recommended IDs
             # In a real microservice, we might just return IDs, but for simplicity let's return data
-            results = []
-            for rec in recommendations:
-                user = User.objects.get(pk=rec['id'])
-                results.append({
-                    '_id': str(user._id),
-                    'displayName': user.displayName,
-                    'age': user.age,
-                    'photos': user.photos,
-                    'match_score': round(rec['match_score'] * 100, 1) # Percentage
-                })
+            results = engine.hydrate(recommendations)
                 
             return Response(results)
         except Exception as e:
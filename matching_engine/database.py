@@ -1,9 +1,185 @@
+"""
+MongoDB connection layer.
+
+The client is created lazily on first use and re-created in a forked child
+process, so pre-fork servers (gunicorn --preload, multiprocessing) never
+share sockets across processes. Pool size, timeouts, compression and the
+read preference of each query class come from config.
+"""
+import os
+import threading
 from pymongo import MongoClient
-from config import MONGODB_URI
+from pymongo.monitoring import ConnectionPoolListener
+from pymongo.read_preferences import read_pref_mode_from_name, make_read_preference
+import config
+
+# Query classes -> read preference. Anything that is later written back
+# (e.g. ELO read-modify-write) must use 'default'.
+READ_PREFERENCES = {
+    'default': config.MONGO_READ_PREFERENCE_DEFAULT,
+    'candidates': config.MONGO_READ_PREFERENCE_CANDIDATES,
+}
+
+
+class PoolStatsListener(ConnectionPoolListener):
+    """
+    Counts connection pool events for the current process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checked_out': 0,
+            'checked_in': 0,
+            'checkout_failures': 0,
+            'pools_cleared': 0,
+        }
+
+    def _incr(self, key):
+        with self._lock:
+            self.counters[key] += 1
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        self._incr('pools_cleared')
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self._incr('connections_created')
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self._incr('connections_closed')
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self._incr('checkout_failures')
+
+    def connection_checked_out(self, event):
+        self._incr('checked_out')
+
+    def connection_checked_in(self, event):
+        self._incr('checked_in')
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.counters)
+        stats['in_use'] = stats['checked_out'] - stats['checked_in']
+        stats['open'] = stats['connections_created'] - stats['connections_closed']
+        return stats
+
+
+def client_options(listener=None):
+    """
+    Keyword arguments for MongoClient / AsyncIOMotorClient built from config.
+    """
+    options = {
+        'maxPoolSize': config.MONGO_MAX_POOL_SIZE,
+        'minPoolSize': config.MONGO_MIN_POOL_SIZE,
+        'connectTimeoutMS': config.MONGO_CONNECT_TIMEOUT_MS,
+        'serverSelectionTimeoutMS': config.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        'readPreference': config.MONGO_READ_PREFERENCE_DEFAULT,
+    }
+    optional = {
+        'maxIdleTimeMS': config.MONGO_MAX_IDLE_TIME_MS,
+        'waitQueueTimeoutMS': config.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        'socketTimeoutMS': config.MONGO_SOCKET_TIMEOUT_MS,
+    }
+    options.update({key: value for key, value in optional.items() if value is not None})
+    if config.MONGO_COMPRESSORS:
+        options['compressors'] = config.MONGO_COMPRESSORS
+    if listener is not None:
+        options['event_listeners'] = [listener]
+    return options
+
+
+def read_preference(query_class):
+    name = READ_PREFERENCES.get(query_class, config.MONGO_READ_PREFERENCE_DEFAULT)
+    return make_read_preference(read_pref_mode_from_name(name), None)
+
+
+_lock = threading.Lock()
+_state = {'pid': None, 'client': None, 'listener': None, 'collections': {}}
+
+
+def get_client():
+    """
+    Return this process's MongoClient, creating it on first use (or after fork).
+    """
+    pid = os.getpid()
+    if _state['pid'] != pid:
+        with _lock:
+            if _state['pid'] != pid:
+                listener = PoolStatsListener()
+                _state.update(
+                    client=MongoClient(config.MONGODB_URI, **client_options(listener)),
+                    listener=listener,
+                    collections={},
+                    pid=pid
+                )
+    return _state['client']
+
+
+def get_database():
+    return get_client().get_database()
+
+
+def get_collection(name, query_class='default'):
+    """
+    Collection handle carrying the read preference configured for `query_class`.
+    """
+    client = get_client()
+    key = (name, query_class)
+    collection = _state['collections'].get(key)
+    if collection is None:
+        collection = client.get_database().get_collection(name, read_preference=read_preference(query_class))
+        _state['collections'][key] = collection
+    return collection
+
+
+def pool_stats():
+    """
+    Connection pool counters and effective settings for the current process.
+    """
+    stats = {'pid': os.getpid(), 'connected': _state['pid'] == os.getpid()}
+    if stats['connected']:
+        stats.update(_state['listener'].snapshot())
+    stats['settings'] = client_options()
+    stats['read_preferences'] = dict(READ_PREFERENCES)
+    return stats
+
+
+class LazyCollection:
+    """
+    Module-level stand-in for a collection that resolves the real handle on
+    every access, so importing this module never opens a connection.
+    """
+
+    def __init__(self, name, query_class='default'):
+        self._name = name
+        self._query_class = query_class
+
+    def __getattr__(self, attr):
+        return getattr(get_collection(self._name, self._query_class), attr)
+
+    def __repr__(self):
+        return f"LazyCollection({self._name!r}, {self._query_class!r})"
 
-client = MongoClient(MONGODB_URI)
-db = client.get_database()
 
 # Collections
-users_collection = db['users']
-interactions_collection = db['interactions']
+users_collection = LazyCollection('users')
+candidate_users_collection = LazyCollection('users', 'candidates')
+interactions_collection = LazyCollection('interactions')
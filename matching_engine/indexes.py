@@ -0,0 +1,138 @@
+"""
+MongoDB index bootstrap and advisor for the Python services' query shapes.
+
+    python indexes.py ensure     # create the indexes below (idempotent)
+    python indexes.py explain    # run explain() on each canonical query
+    python indexes.py            # both
+
+`explain` reports keys/docs examined vs documents returned and whether the
+winning plan is an index scan, so a query that regressed to a collection
+scan shows up before it does in production.
+"""
+import argparse
+import json
+from datetime import datetime, timedelta
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+import config
+from database import get_collection
+from services.storage import PROFILE_FIELDS, RESULT_FIELDS
+
+INDEXES = {
+    'users': [
+        # Candidate scan: {_id: {$ne: ...}, onboardingCompleted: true}
+        IndexModel([('onboardingCompleted', ASCENDING), ('_id', ASCENDING)], name='onboarding_candidates'),
+        # Deck batch stage: active users
+        IndexModel([('lastActive', DESCENDING)], name='last_active'),
+    ],
+    'interactions': [
+        IndexModel([('actor_id', ASCENDING), ('target_id', ASCENDING)], name='actor_target'),
+        IndexModel([('timestamp', DESCENDING)], name='timestamp'),
+    ],
+}
+
+
+def _projection(fields):
+    return {field: 1 for field in fields}
+
+
+def canonical_queries(sample_user_id):
+    """
+    The find() shapes issued by the matching engine and verification service.
+    """
+    since = datetime.utcnow() - timedelta(days=1)
+    return [
+        ('matching: candidate scan', 'users', {
+            'filter': {'_id': {'$ne': sample_user_id}, 'onboardingCompleted': True},
+            'projection': _projection(PROFILE_FIELDS),
+            'limit': config.CANDIDATE_LIMIT,
+        }),
+        ('matching/verification: user by id', 'users', {
+            'filter': {'_id': sample_user_id},
+            'limit': 1,
+        }),
+        ('matching: hydrate/ELO by $in', 'users', {
+            'filter': {'_id': {'$in': [sample_user_id]}},
+            'projection': _projection(RESULT_FIELDS),
+        }),
+        ('matching: interactions by actor/target', 'interactions', {
+            'filter': {'actor_id': sample_user_id, 'target_id': sample_user_id},
+        }),
+        ('matching: recent interactions', 'interactions', {
+            'filter': {'timestamp': {'$gte': since}},
+            'sort': {'timestamp': -1},
+            'limit': 100,
+        }),
+    ]
+
+
+def ensure_indexes():
+    created = {}
+    for name, models in INDEXES.items():
+        created[name] = get_collection(name).create_indexes(models)
+    return created
+
+
+def _plan_stages(plan):
+    """
+    Flatten a winning plan tree into its stage names, root first.
+    """
+    stages = []
+    while plan:
+        stages.append(plan.get('stage'))
+        if 'inputStage' in plan:
+            plan = plan['inputStage']
+        elif plan.get('inputStages'):
+            for child in plan['inputStages']:
+                stages.extend(_plan_stages(child))
+            break
+        else:
+            break
+    return stages
+
+
+def explain_query(collection_name, command):
+    db = get_collection(collection_name).database
+    result = db.command('explain', dict({'find': collection_name}, **command), verbosity='executionStats')
+
+    winning_plan = result['queryPlanner']['winningPlan']
+    stages = _plan_stages(winning_plan.get('queryPlan', winning_plan))
+    stats = result['executionStats']
+    returned = stats['nReturned']
+    return {
+        'stages': stages,
+        'collection_scan': 'COLLSCAN' in stages,
+        'keys_examined': stats['totalKeysExamined'],
+        'docs_examined': stats['totalDocsExamined'],
+        'returned': returned,
+        'docs_examined_per_returned': round(stats['totalDocsExamined'] / returned, 2) if returned else None,
+    }
+
+
+def explain_all():
+    sample = get_collection('users').find_one({}, {'_id': 1})
+    sample_user_id = sample['_id'] if sample else ObjectId()
+    return {
+        label: explain_query(collection_name, command)
+        for label, collection_name, command in canonical_queries(sample_user_id)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('action', nargs='?', choices=['ensure', 'explain', 'all'], default='all')
+    args = parser.parse_args()
+
+    if args.action in ('ensure', 'all'):
+        print(json.dumps({'created': ensure_indexes()}, indent=2))
+
+    if args.action in ('explain', 'all'):
+        report = explain_all()
+        print(json.dumps(report, indent=2, default=str))
+        for label, stats in report.items():
+            if stats['collection_scan']:
+                print(f"WARNING: {label} is a collection scan")
+
+
+if __name__ == '__main__':
+    main()
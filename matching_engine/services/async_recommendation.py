@@ -0,0 +1,44 @@
+"""
+Async variant of RecommendationEngine for the ASGI app.
+
+Mongo reads are awaited (and issued concurrently where they are
+independent); the CPU-bound TF-IDF/ELO scoring runs in an executor so it
+never blocks the event loop.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import config
+from services.recommendation import RecommendationEngine
+from services.storage import RESULT_FIELDS
+
+
+class AsyncRecommendationEngine(RecommendationEngine):
+    def __init__(self, store, executor=None):
+        super().__init__(store=store)
+        self.executor = executor or ThreadPoolExecutor(max_workers=config.SCORING_WORKERS)
+
+    async def get_recommendations(self, user_id, limit=20):
+        """
+        Generate recommendations for a specific user.
+        """
+        try:
+            # Target user and candidate set don't depend on each other
+            target_user, candidates = await asyncio.gather(
+                self.store.get_user(user_id),
+                self.store.get_candidates(user_id)
+            )
+            if not target_user:
+                return []
+
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, self.rank, target_user, candidates, limit)
+        except Exception as e:
+            print(f"Recommendation error: {e}")
+            return []
+
+    async def hydrate(self, recommendations):
+        """
+        Fetch display fields for recommended users in one query.
+        """
+        users = await self.store.get_users([rec['id'] for rec in recommendations], RESULT_FIELDS)
+        return self.build_results(recommendations, users)
@@ -0,0 +1,48 @@
+"""
+Motor (async PyMongo) implementation of the UserStore interface.
+
+Same queries as MongoUserStore, but every method is a coroutine so the
+ASGI app can issue independent reads concurrently.
+"""
+from bson import ObjectId
+from pymongo import UpdateOne
+import config
+from services.storage import PROFILE_FIELDS, MongoUserStore
+
+
+class AsyncMongoUserStore:
+    def __init__(self, users_collection=None, candidates_collection=None):
+        if users_collection is None:
+            from async_database import users_collection
+        if candidates_collection is None:
+            from async_database import candidate_users_collection as candidates_collection
+        self.users = users_collection
+        self.candidates = candidates_collection
+
+    _projection = staticmethod(MongoUserStore._projection)
+
+    async def get_user(self, user_id):
+        return await self.users.find_one({'_id': ObjectId(user_id)}, self._projection(PROFILE_FIELDS))
+
+    async def get_candidates(self, user_id, limit=None):
+        limit = config.CANDIDATE_LIMIT if limit is None else limit
+        cursor = self.candidates.find({
+            '_id': {'$ne': ObjectId(user_id)},
+            'onboardingCompleted': True
+        }, self._projection(PROFILE_FIELDS))
+        return await cursor.limit(limit).to_list(length=limit)
+
+    async def get_users(self, user_ids, fields=PROFILE_FIELDS):
+        if not user_ids:
+            return []
+        object_ids = [ObjectId(user_id) for user_id in user_ids]
+        cursor = self.users.find({'_id': {'$in': object_ids}}, self._projection(fields))
+        return await cursor.to_list(length=len(object_ids))
+
+    async def set_elo_scores(self, scores):
+        if not scores:
+            return
+        await self.users.bulk_write([
+            UpdateOne({'_id': ObjectId(user_id)}, {'$set': {'elo_score': int(elo)}})
+            for user_id, elo in scores.items()
+        ], ordered=False)
@@ -0,0 +1,211 @@
+"""
+Precomputed recommendation decks with cursor-based pagination.
+
+build_decks.py ranks the top DECK_SIZE candidates for every recently active
+user and stores them in `recommendation_decks` as two parallel arrays:
+
+    {_id: <user ObjectId>, version: "<unique build id>", built_on: "2026-10-19",
+     count: 500, ids: [<ObjectId>, ...], scores: [0.83, ...],
+     source: "batch" | "live", built_at}
+
+Pages are read with a $slice projection so only the requested window leaves
+the server. The cursor is opaque to clients (base64 of deck version + offset)
+and is rejected once the deck it points into has been rebuilt, so a page
+never mixes two rankings. Every build (batch run or live top-up) gets its
+own version, so a same-day rebuild invalidates cursors too. Users without a
+deck, or whose deck is older than DECK_MAX_AGE_HOURS, get a live top-up that
+is saved as their deck, which keeps their later pages stable as well.
+"""
+import base64
+import binascii
+import json
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+import numpy as np
+from bson import ObjectId
+from pymongo import ReplaceOne
+from sklearn.feature_extraction.text import TfidfVectorizer
+import config
+from services import scoring
+
+DECKS_COLLECTION = 'recommendation_decks'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class ExpiredCursor(ValueError):
+    pass
+
+
+def encode_cursor(version, offset):
+    raw = json.dumps({'v': version, 'o': offset}, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        version, offset = str(data['v']), int(data['o'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+    if offset < 0:
+        raise InvalidCursor('Invalid cursor')
+    return version, offset
+
+
+def deck_version():
+    """
+    Unique id for one deck build; cursors only stay valid within a build.
+    """
+    return str(ObjectId())
+
+
+class DeckStore:
+    def __init__(self, collection=None):
+        if collection is None:
+            from database import LazyCollection
+            collection = LazyCollection(DECKS_COLLECTION)
+        self.decks = collection
+
+    def save(self, decks, source='batch', version=None):
+        """
+        Upsert {user_id: [(candidate_id, score), ...]} as compact decks.
+        """
+        version = version or deck_version()
+        built_at = datetime.utcnow()
+        requests = [
+            ReplaceOne({'_id': ObjectId(user_id)}, {
+                'version': version,
+                'built_on': built_at.strftime('%Y-%m-%d'),
+                'source': source,
+                'built_at': built_at,
+                'count': len(items),
+                'ids': [ObjectId(candidate_id) for candidate_id, _ in items],
+                'scores': [round(float(score), 4) for _, score in items],
+            }, upsert=True)
+            for user_id, items in decks.items()
+        ]
+        if requests:
+            self.decks.bulk_write(requests, ordered=False)
+        return version
+
+    def get_page(self, user_id, offset, limit, max_age_hours=None):
+        """
+        Deck metadata plus the [offset, offset + limit) window, or None if the
+        user has no deck built within the last `max_age_hours`.
+        """
+        max_age_hours = config.DECK_MAX_AGE_HOURS if max_age_hours is None else max_age_hours
+        built_after = datetime.utcnow() - timedelta(hours=max_age_hours)
+        return self.decks.find_one({'_id': ObjectId(user_id), 'built_at': {'$gte': built_after}}, {
+            'version': 1,
+            'count': 1,
+            'ids': {'$slice': [offset, limit]},
+            'scores': {'$slice': [offset, limit]},
+        })
+
+
+def get_deck_page(engine, deck_store, user_id, cursor=None, limit=20):
+    """
+    Return {'results': [...], 'next_cursor': str | None} for one page of the deck.
+    """
+    if limit <= 0:
+        raise ValueError('limit must be positive')
+    version, offset = decode_cursor(cursor) if cursor else (None, 0)
+
+    page = deck_store.get_page(user_id, offset, limit)
+    if page is None:
+        if cursor:
+            raise ExpiredCursor('Deck expired, start again without a cursor')
+        # Live top-up for users the batch stage hasn't covered; saved so paging stays stable
+        recommendations = engine.get_recommendations(user_id, limit=config.DECK_SIZE)
+        deck_store.save({user_id: [(rec['id'], rec['match_score']) for rec in recommendations]}, source='live')
+        page = deck_store.get_page(user_id, offset, limit)
+        if page is None:
+            return {'results': [], 'next_cursor': None}
+
+    if version is not None and page['version'] != version:
+        raise ExpiredCursor('Deck was rebuilt, start again without a cursor')
+
+    recommendations = [
+        {'id': str(candidate_id), 'match_score': score}
+        for candidate_id, score in zip(page.get('ids', []), page.get('scores', []))
+    ]
+    next_offset = offset + len(recommendations)
+    next_cursor = encode_cursor(page['version'], next_offset) if recommendations and next_offset < page['count'] else None
+
+    return {'results': engine.hydrate(recommendations), 'next_cursor': next_cursor}
+
+
+# --- Batch stage ---
+
+_worker_state = {}
+
+
+def _init_worker(target_matrix, target_ids, target_elos, candidate_matrix, candidate_ids, candidate_elos, deck_size):
+    _worker_state.update(
+        target_matrix=target_matrix, target_ids=target_ids, target_elos=target_elos,
+        candidate_matrix=candidate_matrix, candidate_ids=candidate_ids, candidate_elos=candidate_elos,
+        deck_size=deck_size
+    )
+
+
+def _rank_block(bounds):
+    """
+    Rank one block of target users against every candidate (runs in a worker).
+    """
+    start, end = bounds
+    state = _worker_state
+    target_ids = state['target_ids'][start:end]
+    candidate_ids = state['candidate_ids']
+
+    content = scoring.content_similarity_block(
+        state['target_matrix'][start:end] if state['target_matrix'] is not None else None,
+        state['candidate_matrix'],
+        (end - start, len(candidate_ids))
+    )
+    elo = scoring.elo_similarity_matrix(state['candidate_elos'], state['target_elos'][start:end])
+    scores = scoring.blend(content, elo)
+
+    # Never recommend a user to themselves
+    self_mask = target_ids[:, np.newaxis] == candidate_ids[np.newaxis, :]
+    scores[self_mask] = -np.inf
+
+    top = scoring.top_k_rows(scores, state['deck_size'])
+    decks = {}
+    for row, user_id in enumerate(target_ids):
+        columns = top[row]
+        columns = columns[np.isfinite(scores[row, columns])]
+        decks[str(user_id)] = [(str(candidate_ids[i]), float(scores[row, i])) for i in columns]
+    return decks
+
+
+def rank_decks(targets, candidates, deck_size=None, block_size=None, workers=None):
+    """
+    Yield {user_id: [(candidate_id, score), ...]} one block of targets at a time,
+    spreading blocks across a process pool.
+    """
+    deck_size = deck_size or config.DECK_SIZE
+    block_size = block_size or config.DECK_BLOCK_SIZE
+
+    target_ids = np.array([str(user['_id']) for user in targets])
+    candidate_ids = np.array([str(user['_id']) for user in candidates])
+    target_texts = [scoring.text_features(user) for user in targets]
+    candidate_texts = [scoring.text_features(user) for user in candidates]
+
+    # One global vocabulary/IDF over every profile involved in this run
+    corpus = list(dict(zip(list(candidate_ids) + list(target_ids), candidate_texts + target_texts)).values())
+    matrices = scoring.tfidf_matrices(TfidfVectorizer(stop_words='english'), corpus, target_texts, candidate_texts)
+    target_matrix, candidate_matrix = matrices if matrices else (None, None)
+
+    init_args = (
+        target_matrix, target_ids, np.array([scoring.elo_of(user) for user in targets], dtype=float),
+        candidate_matrix, candidate_ids, np.array([scoring.elo_of(user) for user in candidates], dtype=float),
+        deck_size
+    )
+    bounds = [(start, min(start + block_size, len(targets))) for start in range(0, len(targets), block_size)]
+
+    with ProcessPoolExecutor(max_workers=workers or config.DECK_WORKERS, initializer=_init_worker, initargs=init_args) as pool:
+        yield from pool.map(_rank_block, bounds)
@@ -1,6 +1,18 @@
-from database import users_collection
+from services.scoring import elo_of
 
 K_FACTOR = 32
+ELO_FIELDS = ('elo_score',)
+
+_default_store = None
+
+
+def _get_default_store():
+    global _default_store
+    if _default_store is None:
+        from services.storage import MongoUserStore
+        _default_store = MongoUserStore()
+    return _default_store
+
 
 def calculate_expected_score(rating_a, rating_b):
     """
@@ -8,42 +20,67 @@ def calculate_expected_score(rating_a, rating_b):
     """
     return 1 / (1 + 10 ** ((rating_b - rating_a) / 400))
 
-def update_elo_ratings(winner_id, loser_id):
+
+def compute_elo_update(winner_elo, loser_elo):
+    """
+    Return the new (winner, loser) ratings after a single "match".
+    """
+    expected_winner = calculate_expected_score(winner_elo, loser_elo)
+    expected_loser = calculate_expected_score(loser_elo, winner_elo)
+
+    new_winner_elo = int(winner_elo + K_FACTOR * (1 - expected_winner))
+    new_loser_elo = int(loser_elo + K_FACTOR * (0 - expected_loser))
+    return new_winner_elo, new_loser_elo
+
+
+def elo_updates(users, winner_id, loser_id):
+    """
+    New {user_id: elo} for a winner/loser pair given their fetched documents,
+    or None if either user is missing.
+    """
+    by_id = {str(user['_id']): user for user in users}
+    winner = by_id.get(str(winner_id))
+    loser = by_id.get(str(loser_id))
+    if not winner or not loser:
+        return None
+
+    new_winner_elo, new_loser_elo = compute_elo_update(elo_of(winner), elo_of(loser))
+    return {str(winner_id): new_winner_elo, str(loser_id): new_loser_elo}
+
+
+def _as_pair(scores, winner_id, loser_id):
+    if not scores:
+        return None, None
+    return scores[str(winner_id)], scores[str(loser_id)]
+
+
+def update_elo_ratings(winner_id, loser_id, store=None):
     """
     Update ELO ratings for a winner (Like) and loser (Pass/Target of Like).
     In dating apps:
     - If A likes B, it's a "win" for B (B is desirable).
     - If A passes B, it's a "loss" for B.
     """
+    store = store or _get_default_store()
+    try:
+        scores = elo_updates(store.get_users([winner_id, loser_id], ELO_FIELDS), winner_id, loser_id)
+        if scores:
+            store.set_elo_scores(scores)
+        return _as_pair(scores, winner_id, loser_id)
+    except Exception as e:
+        print(f"ELO update error: {e}")
+        return None, None
+
+
+async def update_elo_ratings_async(winner_id, loser_id, store):
+    """
+    Coroutine version of update_elo_ratings for async stores.
+    """
     try:
-        from bson import ObjectId
-        
-        winner = users_collection.find_one({'_id': ObjectId(winner_id)})
-        loser = users_collection.find_one({'_id': ObjectId(loser_id)})
-        
-        if not winner or not loser:
-            return None, None
-        
-        winner_elo = winner.get('elo_score', 1200)
-        loser_elo = loser.get('elo_score', 1200)
-        
-        expected_winner = calculate_expected_score(winner_elo, loser_elo)
-        expected_loser = calculate_expected_score(loser_elo, winner_elo)
-        
-        # Update scores
-        new_winner_elo = int(winner_elo + K_FACTOR * (1 - expected_winner))
-        new_loser_elo = int(loser_elo + K_FACTOR * (0 - expected_loser))
-        
-        users_collection.update_one(
-            {'_id': ObjectId(winner_id)},
-            {'$set': {'elo_score': new_winner_elo}}
-        )
-        users_collection.update_one(
-            {'_id': ObjectId(loser_id)},
-            {'$set': {'elo_score': new_loser_elo}}
-        )
-        
-        return new_winner_elo, new_loser_elo
+        scores = elo_updates(await store.get_users([winner_id, loser_id], ELO_FIELDS), winner_id, loser_id)
+        if scores:
+            await store.set_elo_scores(scores)
+        return _as_pair(scores, winner_id, loser_id)
     except Exception as e:
         print(f"ELO update error: {e}")
         return None, None
@@ -0,0 +1,137 @@
+"""
+Per-profile text feature cache.
+
+Tokenising a profile (building its text, lower-casing, splitting, dropping
+stop words) costs far more than ranking it, and profiles change much less
+often than they are ranked. This cache keeps each profile's hashed
+term-frequency vector, keyed by a hash of the fields that feed it (bio,
+occupation, education, interests), so only new or edited profiles are
+tokenised again.
+
+The vectors are raw term counts from a HashingVectorizer with the same
+analyzer as the engine's TfidfVectorizer; IDF is still derived per request
+from the candidate set (scoring.content_similarity_from_counts). Apart from
+rare hash collisions in the 2**20 feature space, scores match the
+TfidfVectorizer path.
+"""
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import HashingVectorizer
+import config
+from services import scoring
+
+# Python object overhead per entry beyond the two numpy buffers (rough, for reporting)
+_ENTRY_OVERHEAD = sys.getsizeof(b'x' * 16) + 2 * sys.getsizeof(np.empty(0)) + sys.getsizeof((None, None)) + 64
+
+
+def profile_key(profile):
+    """
+    Content hash of the fields that make up a profile's text features.
+    """
+    interests = profile.get('interests') or []
+    fields = (
+        profile.get('bio') or '',
+        profile.get('occupation') or '',
+        profile.get('education') or '',
+        interests if isinstance(interests, list) else [],
+    )
+    return hashlib.blake2b(json.dumps(fields, default=str).encode(), digest_size=16).digest()
+
+
+class FeatureCache:
+    def __init__(self, max_entries=None, n_features=None):
+        self.max_entries = config.FEATURE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        self.vectorizer = HashingVectorizer(
+            stop_words='english',
+            alternate_sign=False,
+            norm=None,
+            n_features=n_features or config.FEATURE_CACHE_N_FEATURES,
+            dtype=np.float32
+        )
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._memory_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _insert(self, key, row):
+        if key in self._entries:
+            return
+        self._entries[key] = row
+        self._memory_bytes += row[0].nbytes + row[1].nbytes + _ENTRY_OVERHEAD
+        while len(self._entries) > self.max_entries:
+            _, (indices, data) = self._entries.popitem(last=False)
+            self._memory_bytes -= indices.nbytes + data.nbytes + _ENTRY_OVERHEAD
+            self.evictions += 1
+
+    def transform(self, profiles):
+        """
+        Term-count matrix (one row per profile), tokenising only cache misses.
+        """
+        keys = [profile_key(profile) for profile in profiles]
+        rows = [None] * len(profiles)
+        missing = []
+
+        with self._lock:
+            for i, key in enumerate(keys):
+                row = self._entries.get(key)
+                if row is None:
+                    missing.append(i)
+                else:
+                    self._entries.move_to_end(key)
+                    rows[i] = row
+            self.hits += len(profiles) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            # HashingVectorizer is stateless, so misses are tokenised outside the lock
+            matrix = self.vectorizer.transform([scoring.text_features(profiles[i]) for i in missing])
+            with self._lock:
+                for j, i in enumerate(missing):
+                    start, end = matrix.indptr[j], matrix.indptr[j + 1]
+                    row = (matrix.indices[start:end].copy(), matrix.data[start:end].copy())
+                    rows[i] = row
+                    self._insert(keys[i], row)
+
+        indptr = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(indices) for indices, _ in rows], out=indptr[1:])
+        indices = np.concatenate([indices for indices, _ in rows]) if rows else np.empty(0, dtype=np.int32)
+        data = np.concatenate([data for _, data in rows]) if rows else np.empty(0, dtype=np.float32)
+        return csr_matrix((data, indices, indptr), shape=(len(rows), self.vectorizer.n_features))
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else None,
+                'memory_bytes': self._memory_bytes,
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_feature_cache():
+    """
+    Process-wide cache shared by every engine instance (None when disabled).
+    """
+    global _shared_cache
+    if not config.FEATURE_CACHE_ENABLED:
+        return None
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = FeatureCache()
+    return _shared_cache
@@ -0,0 +1,284 @@
+"""
+Versioned, memory-mapped feature snapshot shared by all worker processes.
+
+A builder writes every user's term counts (CSR arrays), id table and numeric
+columns as .npy files into a new version directory, then atomically points
+CURRENT at it. Workers np.load(..., mmap_mode='r') the arrays, so the
+operating system page cache holds one copy no matter how many processes
+map it, and swap to a newer version when CURRENT changes.
+
+Raw term counts (not TF-IDF weights) are stored so each request can still
+derive IDF from its own candidate set, exactly like the live
+TfidfVectorizer.fit_transform path.
+
+Layout:
+    <root>/CURRENT              name of the live version directory
+    <root>/v<ns>/meta.json      version, row count, build time
+    <root>/v<ns>/vocabulary.json
+    <root>/v<ns>/<array>.npy    ids, data, indices, indptr, elo, age, onboarded
+"""
+import json
+import os
+import shutil
+import threading
+import time
+import numpy as np
+from scipy.sparse import csr_matrix
+from sklearn.feature_extraction.text import CountVectorizer
+import config
+from services import scoring
+from services.recommendation import RecommendationEngine
+
+ARRAYS = ('ids', 'data', 'indices', 'indptr', 'elo', 'age', 'onboarded')
+CURRENT = 'CURRENT'
+
+
+def _analyzer_vectorizer(vocabulary=None):
+    # Same tokenisation/stop words as RecommendationEngine's TfidfVectorizer
+    return CountVectorizer(stop_words='english', vocabulary=vocabulary, dtype=np.int32)
+
+
+def build_snapshot(users, root, keep=None):
+    """
+    Write a new snapshot version for `users` and publish it. Returns the version name.
+    """
+    keep = config.FEATURE_SNAPSHOT_KEEP if keep is None else keep
+    users = sorted(users, key=lambda user: user['_id'])
+
+    vectorizer = _analyzer_vectorizer()
+    try:
+        counts = vectorizer.fit_transform([scoring.text_features(user) for user in users]).tocsr()
+        vocabulary = vectorizer.get_feature_names_out().tolist()
+    except ValueError:
+        counts = csr_matrix((len(users), 0), dtype=np.int32)
+        vocabulary = []
+
+    arrays = {
+        'ids': np.array([str(user['_id']) for user in users], dtype='S24'),
+        'data': counts.data,
+        'indices': counts.indices,
+        'indptr': counts.indptr,
+        'elo': np.array([scoring.elo_of(user) for user in users], dtype=np.float64),
+        'age': np.array([user.get('age') or 0 for user in users], dtype=np.int32),
+        'onboarded': np.array([bool(user.get('onboardingCompleted')) for user in users], dtype=bool),
+    }
+
+    version = f"v{time.time_ns()}"
+    os.makedirs(root, exist_ok=True)
+    tmp_dir = os.path.join(root, f".{version}.tmp")
+    os.makedirs(tmp_dir)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_dir, f"{name}.npy"), array)
+    with open(os.path.join(tmp_dir, 'vocabulary.json'), 'w') as f:
+        json.dump(vocabulary, f)
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump({'version': version, 'rows': len(users), 'terms': len(vocabulary), 'built_at': time.time()}, f)
+    os.rename(tmp_dir, os.path.join(root, version))
+
+    # Publish: CURRENT is replaced atomically, readers see old or new, never half
+    pointer_tmp = os.path.join(root, f".{CURRENT}.tmp")
+    with open(pointer_tmp, 'w') as f:
+        f.write(version)
+    os.replace(pointer_tmp, os.path.join(root, CURRENT))
+
+    _prune(root, keep)
+    return version
+
+
+def _prune(root, keep):
+    """
+    Remove all but the newest `keep` versions. Workers still mapping an old
+    version keep their pages until they swap (unlinked files stay readable).
+    """
+    versions = sorted(name for name in os.listdir(root) if name.startswith('v'))
+    for name in versions[:-keep] if keep else []:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+def read_current_version(root):
+    try:
+        with open(os.path.join(root, CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+class FeatureSnapshot:
+    """
+    Read-only, zero-copy view of one snapshot version.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        arrays = {name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode='r') for name in ARRAYS}
+        with open(os.path.join(directory, 'meta.json')) as f:
+            self.meta = json.load(f)
+
+        self.version = self.meta['version']
+        self.ids = arrays['ids']
+        self.elo = arrays['elo']
+        self.age = arrays['age']
+        self.onboarded = arrays['onboarded']
+        self.counts = csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']),
+            shape=(len(self.ids), self.meta['terms'])
+        )
+        self._onboarded_rows = None
+        self._vectorizer = None
+        self._columns = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.ids)
+
+    def row_of(self, user_id):
+        """
+        Row index for `user_id` (binary search over the sorted id table), or None.
+        """
+        key = str(user_id).encode()
+        row = int(np.searchsorted(self.ids, key))
+        if row < len(self.ids) and self.ids[row] == key:
+            return row
+        return None
+
+    def vectorize(self, text):
+        """
+        Term counts for a profile that isn't in the snapshot yet.
+
+        Terms outside the snapshot vocabulary get extra columns past the
+        stored ones rather than being dropped, so the target's norm and IDF
+        match a TfidfVectorizer fitted on this request's texts.
+        """
+        with self._lock:
+            if self._vectorizer is None:
+                with open(os.path.join(self.directory, 'vocabulary.json')) as f:
+                    vocabulary = json.load(f)
+                self._columns = {term: i for i, term in enumerate(vocabulary)}
+                self._vectorizer = _analyzer_vectorizer()
+        analyzer = self._vectorizer.build_analyzer()
+
+        counts = {}
+        extra = {}
+        for term in analyzer(text):
+            column = self._columns.get(term)
+            if column is None:
+                column = extra.setdefault(term, self.counts.shape[1] + len(extra))
+            counts[column] = counts.get(column, 0) + 1
+
+        columns = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        data = np.fromiter(counts.values(), dtype=np.int32, count=len(counts))
+        return csr_matrix(
+            (data, columns, np.array([0, len(counts)])),
+            shape=(1, self.counts.shape[1] + len(extra))
+        )
+
+    def candidate_rows(self, exclude_row=None, limit=None):
+        """
+        First `limit` onboarded rows in _id order, skipping `exclude_row`.
+        """
+        limit = config.CANDIDATE_LIMIT if limit is None else limit
+        if self._onboarded_rows is None:
+            self._onboarded_rows = np.flatnonzero(self.onboarded)
+        rows = self._onboarded_rows[:limit + 1]
+        if exclude_row is not None:
+            rows = rows[rows != exclude_row]
+        return rows[:limit]
+
+    def score(self, target_counts, target_elo, rows):
+        """
+        TF-IDF + ELO blend of the target against `rows`, IDF taken over that candidate set.
+        """
+        candidate_counts = self.counts[rows]
+        if target_counts.shape[1] > candidate_counts.shape[1]:
+            # Out-of-vocabulary target terms: widen with empty columns
+            candidate_counts = csr_matrix(
+                (candidate_counts.data, candidate_counts.indices, candidate_counts.indptr),
+                shape=(candidate_counts.shape[0], target_counts.shape[1])
+            )
+        content = scoring.content_similarity_from_counts(target_counts, candidate_counts)
+        elo = scoring.elo_similarity(self.elo[rows], target_elo)
+        return scoring.blend(content, elo)
+
+
+class SnapshotManager:
+    """
+    Hands out the current FeatureSnapshot, re-checking CURRENT at most every
+    `refresh_interval` seconds and swapping in a new version atomically.
+    """
+
+    def __init__(self, root, refresh_interval=None):
+        self.root = root
+        self.refresh_interval = config.FEATURE_SNAPSHOT_REFRESH if refresh_interval is None else refresh_interval
+        self._snapshot = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    def current(self):
+        now = time.monotonic()
+        if self._checked_at is None or now - self._checked_at >= self.refresh_interval:
+            with self._lock:
+                if self._checked_at is None or now - self._checked_at >= self.refresh_interval:
+                    self._checked_at = now
+                    self._maybe_swap()
+        return self._snapshot
+
+    def _maybe_swap(self):
+        version = read_current_version(self.root)
+        if version is None or (self._snapshot is not None and self._snapshot.version == version):
+            return
+        try:
+            # A single reference assignment: in-flight requests keep the old view
+            self._snapshot = FeatureSnapshot(os.path.join(self.root, version))
+            print(f"Feature snapshot loaded: {version} ({len(self._snapshot)} users)")
+        except (OSError, ValueError) as e:
+            print(f"Feature snapshot load error: {e}")
+
+    def stats(self):
+        snapshot = self._snapshot
+        if snapshot is None:
+            return {'loaded': False}
+        return dict(snapshot.meta, loaded=True, pid=os.getpid())
+
+
+class SnapshotRecommendationEngine(RecommendationEngine):
+    """
+    Ranks from the shared snapshot; the store is only used for users that
+    joined after the snapshot was built, hydration and ELO writes.
+    ELO scores are as fresh as the snapshot.
+    """
+
+    def __init__(self, store, snapshots):
+        super().__init__(store=store)
+        self.snapshots = snapshots
+
+    def get_recommendations(self, user_id, limit=20):
+        snapshot = self.snapshots.current()
+        if snapshot is None:
+            return super().get_recommendations(user_id, limit)
+
+        try:
+            target_row = snapshot.row_of(user_id)
+            if target_row is not None:
+                target_counts = snapshot.counts[target_row]
+                target_elo = float(snapshot.elo[target_row])
+            else:
+                target_user = self.store.get_user(user_id)
+                if not target_user:
+                    return []
+                target_counts = snapshot.vectorize(scoring.text_features(target_user))
+                target_elo = scoring.elo_of(target_user)
+
+            rows = snapshot.candidate_rows(exclude_row=target_row)
+            if not rows.size:
+                return []
+
+            final_scores = snapshot.score(target_counts, target_elo, rows)
+            ids = snapshot.ids[rows]
+
+            return [
+                {'id': ids[i].decode(), 'match_score': float(final_scores[i])}
+                for i in scoring.top_k(final_scores, limit)
+            ]
+        except Exception as e:
+            print(f"Recommendation error: {e}")
+            return []
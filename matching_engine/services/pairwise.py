@@ -0,0 +1,74 @@
+"""
+Request handling shared by the sync and async /api/scores/ routes.
+
+Body: {"user_id": "...", "candidate_ids": [...]}   -> JSON object
+  or: {"user_ids": [...], "candidate_ids": [...]}  -> NDJSON stream, one line per user
+"""
+import json
+from bson import ObjectId
+import config
+from services.storage import PROFILE_FIELDS
+
+
+class PairwiseRequestError(ValueError):
+    pass
+
+
+def parse_request(data):
+    """
+    Validate the request body and return (user_ids, candidate_ids, stream).
+    """
+    if not data or not isinstance(data, dict):
+        raise PairwiseRequestError('Request body must be a JSON object')
+
+    candidate_ids = data.get('candidate_ids')
+    if data.get('user_ids') is not None:
+        user_ids, stream = data.get('user_ids'), True
+    elif data.get('user_id'):
+        user_ids, stream = [data.get('user_id')], False
+    else:
+        raise PairwiseRequestError('user_id or user_ids is required')
+
+    if not isinstance(user_ids, list) or not isinstance(candidate_ids, list) or not candidate_ids:
+        raise PairwiseRequestError('user_ids and candidate_ids must be non-empty lists')
+
+    for value in user_ids + candidate_ids:
+        if not isinstance(value, str) or not ObjectId.is_valid(value):
+            raise PairwiseRequestError(f'Invalid id: {value!r}')
+
+    # Drop duplicates but keep the caller's order
+    user_ids = list(dict.fromkeys(str(user_id) for user_id in user_ids))
+    candidate_ids = list(dict.fromkeys(str(candidate_id) for candidate_id in candidate_ids))
+
+    if len(user_ids) > config.PAIRWISE_MAX_IDS or len(candidate_ids) > config.PAIRWISE_MAX_IDS:
+        raise PairwiseRequestError(f'At most {config.PAIRWISE_MAX_IDS} user_ids and candidate_ids per request')
+
+    return user_ids, candidate_ids, stream
+
+
+def split_profiles(profiles, user_ids, candidate_ids):
+    """
+    Order fetched profiles like the request; unknown ids are skipped.
+    """
+    by_id = {str(profile['_id']): profile for profile in profiles}
+    users = [by_id[user_id] for user_id in user_ids if user_id in by_id]
+    candidates = [by_id[candidate_id] for candidate_id in candidate_ids if candidate_id in by_id]
+    return users, candidates
+
+
+def load_profiles(store, user_ids, candidate_ids):
+    profiles = store.get_users(list(dict.fromkeys(user_ids + candidate_ids)), PROFILE_FIELDS)
+    return split_profiles(profiles, user_ids, candidate_ids)
+
+
+async def load_profiles_async(store, user_ids, candidate_ids):
+    profiles = await store.get_users(list(dict.fromkeys(user_ids + candidate_ids)), PROFILE_FIELDS)
+    return split_profiles(profiles, user_ids, candidate_ids)
+
+
+def to_payload(user_id, scores):
+    return {'user_id': user_id, 'scores': scores}
+
+
+def to_ndjson(block):
+    return ''.join(json.dumps(to_payload(user_id, scores)) + '\n' for user_id, scores in block)
@@ -0,0 +1,162 @@
+"""
+In-memory UserStore kept fresh by services.profile_sync.
+
+Holds every user's ranking and display fields, each user's ELO score and the
+set of users they have already acted on, so the request path can rank and
+hydrate without going back to MongoDB. ELO writes go through to the backing
+store and are applied locally at the same time. Until the watcher has
+loaded its first snapshot, reads go to the backing store.
+
+Each worker process holds its own copy: budget roughly the size of the
+users collection's cached fields (plus one entry per interaction when
+EXCLUDE_SEEN_CANDIDATES is on) per worker.
+"""
+import threading
+import config
+from services.storage import UserStore, PROFILE_FIELDS, RESULT_FIELDS
+
+CACHED_FIELDS = tuple(dict.fromkeys(PROFILE_FIELDS + RESULT_FIELDS + ('onboardingCompleted',)))
+
+
+def interaction_pair(doc):
+    """
+    (actor_id, target_id) of an interaction written by either the Node backend
+    (userId/targetId) or this service (actor_id/target_id).
+    """
+    actor_id = doc.get('actor_id') or doc.get('userId')
+    target_id = doc.get('target_id') or doc.get('targetId')
+    if actor_id is None or target_id is None:
+        return None
+    return str(actor_id), str(target_id)
+
+
+class ProfileCache(UserStore):
+    def __init__(self, backing_store=None):
+        self.backing_store = backing_store
+        self._lock = threading.RLock()
+        self._profiles = {}
+        self._seen = {}
+        self.loaded = False
+
+    # --- Sync API (called by the watcher) ---
+
+    def load(self, users, interactions=()):
+        """
+        Replace the cache contents with a full snapshot.
+        """
+        profiles = {}
+        for user in users:
+            profiles[str(user['_id'])] = self._slim(user)
+
+        seen = {}
+        for doc in interactions:
+            pair = interaction_pair(doc)
+            if pair:
+                seen.setdefault(pair[0], set()).add(pair[1])
+
+        with self._lock:
+            self._profiles = profiles
+            self._seen = seen
+            self.loaded = True
+
+    def upsert(self, user):
+        with self._lock:
+            self._profiles[str(user['_id'])] = self._slim(user)
+
+    def apply_update(self, user_id, updated_fields, removed_fields=()):
+        """
+        Apply a change-stream style partial update. Returns False if the user
+        is unknown (caller should fetch the full document).
+        """
+        with self._lock:
+            profile = self._profiles.get(str(user_id))
+            if profile is None:
+                return False
+            for field, value in updated_fields.items():
+                top_level = field.split('.', 1)[0]
+                if top_level in CACHED_FIELDS:
+                    if top_level == field:
+                        profile[field] = value
+                    else:
+                        # Nested path (e.g. "photos.2"): caller re-fetches the document
+                        return False
+            for field in removed_fields:
+                profile.pop(field, None)
+            return True
+
+    def delete(self, user_id):
+        with self._lock:
+            self._profiles.pop(str(user_id), None)
+            self._seen.pop(str(user_id), None)
+
+    def add_interaction(self, doc):
+        pair = interaction_pair(doc)
+        if pair:
+            with self._lock:
+                self._seen.setdefault(pair[0], set()).add(pair[1])
+
+    def stats(self):
+        with self._lock:
+            return {
+                'loaded': self.loaded,
+                'profiles': len(self._profiles),
+                'users_with_seen': len(self._seen),
+                'seen_pairs': sum(len(targets) for targets in self._seen.values()),
+            }
+
+    @staticmethod
+    def _slim(user):
+        profile = {field: user[field] for field in CACHED_FIELDS if field in user}
+        profile['_id'] = user['_id']
+        return profile
+
+    # --- UserStore API (called by the engine) ---
+
+    def _fall_back(self):
+        return not self.loaded and self.backing_store is not None
+
+    def get_user(self, user_id):
+        if self._fall_back():
+            return self.backing_store.get_user(user_id)
+        with self._lock:
+            profile = self._profiles.get(str(user_id))
+            return dict(profile) if profile else None
+
+    def get_seen(self, user_id):
+        with self._lock:
+            return set(self._seen.get(str(user_id), ()))
+
+    def get_candidates(self, user_id, limit=None):
+        limit = config.CANDIDATE_LIMIT if limit is None else limit
+        if self._fall_back():
+            return self.backing_store.get_candidates(user_id, limit)
+        user_id = str(user_id)
+        with self._lock:
+            seen = self._seen.get(user_id, ()) if config.EXCLUDE_SEEN_CANDIDATES else ()
+            candidates = []
+            for candidate_id, profile in self._profiles.items():
+                if candidate_id == user_id or candidate_id in seen or not profile.get('onboardingCompleted'):
+                    continue
+                candidates.append(profile)
+                if len(candidates) >= limit:
+                    break
+            return candidates
+
+    def get_users(self, user_ids, fields=PROFILE_FIELDS):
+        if self._fall_back():
+            return self.backing_store.get_users(user_ids, fields)
+        with self._lock:
+            return [
+                self._profiles[str(user_id)]
+                for user_id in user_ids
+                if str(user_id) in self._profiles
+            ]
+
+    def set_elo_scores(self, scores):
+        if self.backing_store is not None:
+            self.backing_store.set_elo_scores(scores)
+        with self._lock:
+            for user_id, elo in scores.items():
+                profile = self._profiles.get(str(user_id))
+                if profile is not None:
+                    profile['elo_score'] = int(elo)
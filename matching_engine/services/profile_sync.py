@@ -0,0 +1,195 @@
+"""
+Keeps a ProfileCache in sync with the `users` and `interactions` collections.
+
+On a replica set the watcher tails a database change stream filtered to
+those two collections. The resume token is kept in memory across
+reconnects; the cache itself is rebuilt on every start, so nothing is
+persisted.
+
+Standalone mongods (local dev, tests) don't support change streams; there
+it falls back to polling `users.updatedAt` and new interaction `_id`s.
+Polling cannot observe deleted users.
+
+Interactions are only loaded and followed when EXCLUDE_SEEN_CANDIDATES needs
+the seen-sets. The watcher is a thread, so it is started per process on
+first use (ensure_watcher), never at import: a thread started in a pre-fork
+master does not survive into the workers.
+"""
+import os
+import threading
+from pymongo.errors import OperationFailure, PyMongoError
+import config
+from services.profile_cache import CACHED_FIELDS
+
+WATCHED_COLLECTIONS = ('users', 'interactions')
+
+# Server error codes meaning "change streams are not available here"
+CHANGE_STREAMS_UNSUPPORTED = {40573, 40415, 20}
+# The resume token is no longer in the oplog
+CHANGE_STREAM_HISTORY_LOST = 286
+
+
+class ProfileSyncWatcher(threading.Thread):
+    def __init__(self, cache, db, poll_interval=None, track_seen=None):
+        super().__init__(name='profile-sync', daemon=True)
+        self.cache = cache
+        self.db = db
+        self.poll_interval = poll_interval or config.PROFILE_SYNC_POLL_INTERVAL
+        self.track_seen = config.EXCLUDE_SEEN_CANDIDATES if track_seen is None else track_seen
+        self.resume_token = None
+        self.mode = None
+        self.ready = threading.Event()
+        self._stop_event = threading.Event()
+        self._last_user_update = None
+        self._last_interaction_id = None
+
+    def stop(self):
+        self._stop_event.set()
+
+    # --- Bootstrap ---
+
+    def bootstrap(self):
+        """
+        Load a full snapshot into the cache and remember where polling resumes.
+        """
+        projection = {field: 1 for field in CACHED_FIELDS + ('updatedAt',)}
+        users = list(self.db['users'].find({}, projection).sort('_id', 1))
+        interactions = []
+        if self.track_seen:
+            interactions = list(self.db['interactions'].find(
+                {}, {'actor_id': 1, 'target_id': 1, 'userId': 1, 'targetId': 1}
+            ).sort('_id', 1))
+
+        self.cache.load(users, interactions)
+
+        updated = [user['updatedAt'] for user in users if user.get('updatedAt')]
+        self._last_user_update = max(updated) if updated else None
+        self._last_interaction_id = interactions[-1]['_id'] if interactions else None
+        print(f"Profile sync: loaded {len(users)} users, {len(interactions)} interactions")
+
+    # --- Change stream mode ---
+
+    def _fetch_user(self, user_id):
+        projection = {field: 1 for field in CACHED_FIELDS}
+        user = self.db['users'].find_one({'_id': user_id}, projection)
+        if user:
+            self.cache.upsert(user)
+        else:
+            self.cache.delete(user_id)
+
+    def apply_change(self, change):
+        collection = change.get('ns', {}).get('coll')
+        operation = change.get('operationType')
+        document_key = change.get('documentKey', {}).get('_id')
+
+        if collection == 'interactions':
+            if operation == 'insert':
+                self.cache.add_interaction(change['fullDocument'])
+            return
+
+        if operation == 'delete':
+            self.cache.delete(document_key)
+        elif operation in ('insert', 'replace'):
+            self.cache.upsert(change['fullDocument'])
+        elif operation == 'update':
+            description = change.get('updateDescription', {})
+            applied = self.cache.apply_update(
+                document_key,
+                description.get('updatedFields', {}),
+                description.get('removedFields', [])
+            )
+            if not applied:
+                self._fetch_user(document_key)
+
+    def _consume(self, stream):
+        while not self._stop_event.is_set() and stream.alive:
+            change = stream.try_next()
+            if change is not None:
+                self.apply_change(change)
+            if stream.resume_token is not None:
+                self.resume_token = stream.resume_token
+
+    # --- Polling fallback ---
+
+    def poll_once(self):
+        users_filter = {'updatedAt': {'$gt': self._last_user_update}} if self._last_user_update else {}
+        projection = {field: 1 for field in CACHED_FIELDS + ('updatedAt',)}
+        for user in self.db['users'].find(users_filter, projection).sort('updatedAt', 1):
+            self.cache.upsert(user)
+            if user.get('updatedAt'):
+                self._last_user_update = user['updatedAt']
+
+        if not self.track_seen:
+            return
+        interactions_filter = {'_id': {'$gt': self._last_interaction_id}} if self._last_interaction_id else {}
+        for doc in self.db['interactions'].find(interactions_filter).sort('_id', 1):
+            self.cache.add_interaction(doc)
+            self._last_interaction_id = doc['_id']
+
+    def _poll(self):
+        self.mode = 'polling'
+        self.ready.set()
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.poll_once()
+            except PyMongoError as e:
+                print(f"Profile sync poll error: {e}")
+
+    # --- Thread entry point ---
+
+    def run(self):
+        collections = list(WATCHED_COLLECTIONS) if self.track_seen else ['users']
+        pipeline = [{'$match': {'ns.coll': {'$in': collections}}}]
+
+        while not self._stop_event.is_set():
+            try:
+                with self.db.watch(pipeline, resume_after=self.resume_token, max_await_time_ms=1000) as stream:
+                    if self.resume_token is None:
+                        # Stream is open before the snapshot is read, so no write is missed;
+                        # replaying an already-loaded change is harmless.
+                        self.bootstrap()
+                    self.mode = 'change_stream'
+                    self.ready.set()
+                    self._consume(stream)
+            except OperationFailure as e:
+                if e.code in CHANGE_STREAMS_UNSUPPORTED:
+                    print("Profile sync: change streams unavailable, polling instead")
+                    self.bootstrap()
+                    self._poll()
+                    return
+                if e.code == CHANGE_STREAM_HISTORY_LOST:
+                    print("Profile sync: resume token expired, reloading snapshot")
+                    self.resume_token = None
+                    continue
+                print(f"Profile sync error: {e}")
+                self._stop_event.wait(self.poll_interval)
+            except PyMongoError as e:
+                print(f"Profile sync error: {e}")
+                self._stop_event.wait(self.poll_interval)
+
+
+_lock = threading.Lock()
+_state = {'pid': None, 'watcher': None}
+
+
+def ensure_watcher(cache, db_factory=None):
+    """
+    Return this process's watcher for `cache`, starting it on first use (or after fork).
+    """
+    pid = os.getpid()
+    if _state['pid'] != pid:
+        with _lock:
+            if _state['pid'] != pid:
+                if db_factory is None:
+                    from database import get_database as db_factory
+                watcher = ProfileSyncWatcher(cache, db_factory())
+                watcher.start()
+                _state.update(pid=pid, watcher=watcher)
+    return _state['watcher']
+
+
+def current_watcher():
+    """
+    This process's watcher, or None if it hasn't been started here.
+    """
+    return _state['watcher'] if _state['pid'] == os.getpid() else None
@@ -1,88 +1,144 @@
 import numpy as np
-import pandas as pd
+from sklearn.base import clone
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from database import users_collection
-from bson import ObjectId
+import config
+from services import scoring
+from services.feature_cache import get_feature_cache
+from services.storage import RESULT_FIELDS
+
 
 class RecommendationEngine:
-    def __init__(self):
+    def __init__(self, store=None, feature_cache=None):
+        if store is None:
+            from services.storage import MongoUserStore
+            store = MongoUserStore()
+        self.store = store
         self.vectorizer = TfidfVectorizer(stop_words='english')
+        self.feature_cache = feature_cache if feature_cache is not None else get_feature_cache()
 
     def _prepare_data(self, users):
         """
-        Convert MongoDB documents to DataFrame and preprocess features.
+        Extract ids, text features and ELO scores from profile documents.
+        """
+        ids = [str(user['_id']) for user in users]
+        texts = [scoring.text_features(user) for user in users]
+        elos = np.array([scoring.elo_of(user) for user in users], dtype=float)
+        return ids, texts, elos
+
+    def score_candidates(self, target_user, candidates):
+        """
+        Blend content and ELO similarity for every candidate against the target user.
         """
-        data = []
-        for user in users:
-            # Combine text features for content-based filtering
-            interests = user.get('interests', [])
-            interests_str = ' '.join(interests) if isinstance(interests, list) else ''
-            
-            text_features = f"{user.get('bio', '')} {user.get('occupation', '')} {user.get('education', '')} {interests_str}"
-            
-            data.append({
-                'id': str(user['_id']),
-                'text_features': text_features,
-                'age': user.get('age', 0),
-                'elo_score': user.get('elo_score', 1200),
-                'location': user.get('location', '')
-            })
-        
-        return pd.DataFrame(data)
+        # 1. Content-Based Filtering (Text Similarity)
+        if self.feature_cache is not None:
+            # Term counts come from the per-profile cache; only changed profiles are re-tokenised
+            ids = [str(user['_id']) for user in candidates]
+            elos = np.array([scoring.elo_of(user) for user in candidates], dtype=float)
+            cosine_sim = scoring.content_similarity_from_counts(
+                self.feature_cache.transform([target_user]),
+                self.feature_cache.transform(candidates)
+            )
+        else:
+            ids, texts, elos = self._prepare_data(candidates)
+            # Fit a fresh copy so concurrent requests never share vectorizer state
+            cosine_sim = scoring.content_similarity(clone(self.vectorizer), scoring.text_features(target_user), texts)
+
+        # 2. ELO Score Similarity
+        elo_score = scoring.elo_similarity(elos, scoring.elo_of(target_user))
+
+        # 3. Combine Scores (Weighted Average)
+        return ids, scoring.blend(cosine_sim, elo_score)
+
+    def rank(self, target_user, candidates, limit=20):
+        """
+        Return the top `limit` candidates as [{'id', 'match_score'}], best first.
+        """
+        if not candidates:
+            return []
+
+        ids, final_scores = self.score_candidates(target_user, candidates)
+
+        return [
+            {'id': ids[i], 'match_score': float(final_scores[i])}
+            for i in scoring.top_k(final_scores, limit)
+        ]
+
+    def score_pairs(self, target_users, candidates, block_size=None):
+        """
+        Score every target user against every candidate with the same
+        TF-IDF + ELO blend as get_recommendations, one matrix block of
+        targets at a time.
+
+        Yields one list per block of (target_id, [{'id', 'match_score'}]),
+        with candidates in input order and the target itself left out.
+        """
+        block_size = block_size or config.PAIRWISE_BLOCK_SIZE
+        candidate_ids, candidate_texts, candidate_elos = self._prepare_data(candidates)
+        target_ids, target_texts, target_elos = self._prepare_data(target_users)
+
+        # One shared vocabulary/IDF over every distinct profile in the batch
+        corpus = list(dict(zip(candidate_ids + target_ids, candidate_texts + target_texts)).values())
+        matrices = scoring.tfidf_matrices(clone(self.vectorizer), corpus, target_texts, candidate_texts)
+        target_matrix, candidate_matrix = matrices if matrices else (None, None)
+
+        for start in range(0, len(target_ids), block_size):
+            end = min(start + block_size, len(target_ids))
+            content = scoring.content_similarity_block(
+                target_matrix[start:end] if target_matrix is not None else None,
+                candidate_matrix,
+                (end - start, len(candidate_ids))
+            )
+            elo = scoring.elo_similarity_matrix(candidate_elos, target_elos[start:end])
+            scores = scoring.blend(content, elo)
+
+            block = []
+            for row, target_id in enumerate(target_ids[start:end]):
+                block.append((target_id, [
+                    {'id': candidate_id, 'match_score': round(float(score) * 100, 1)}
+                    for candidate_id, score in zip(candidate_ids, scores[row])
+                    if candidate_id != target_id
+                ]))
+            yield block
 
     def get_recommendations(self, user_id, limit=20):
         """
         Generate recommendations for a specific user.
         """
         try:
-            target_user = users_collection.find_one({'_id': ObjectId(user_id)})
+            target_user = self.store.get_user(user_id)
             if not target_user:
                 return []
 
-            # Get all potential matches (exclude self)
-            candidates = list(users_collection.find({
-                '_id': {'$ne': ObjectId(user_id)},
-                'onboardingCompleted': True
-            }).limit(100))
-            
-            if not candidates:
-                return []
-
-            # Prepare data
-            df = self._prepare_data(candidates + [target_user])
-            
-            if len(df) < 2:
-                return []
-            
-            # 1. Content-Based Filtering (Text Similarity)
-            try:
-                tfidf_matrix = self.vectorizer.fit_transform(df['text_features'])
-                
-                # Calculate cosine similarity between target user (last row) and all others
-                target_idx = len(df) - 1
-                cosine_sim = cosine_similarity(tfidf_matrix[target_idx:target_idx+1], tfidf_matrix[:-1]).flatten()
-            except:
-                # Fallback if TF-IDF fails
-                cosine_sim = np.ones(len(df) - 1) * 0.5
-            
-            # 2. ELO Score Similarity
-            target_elo = target_user.get('elo_score', 1200)
-            elo_diff = np.abs(df['elo_score'][:-1] - target_elo)
-            max_diff = elo_diff.max() if elo_diff.max() > 0 else 1
-            elo_score = 1 - (elo_diff / (max_diff + 1))
-            
-            # 3. Combine Scores (Weighted Average)
-            final_scores = (0.7 * cosine_sim) + (0.3 * elo_score)
-            
-            # Add scores to dataframe (excluding target user)
-            results = df.iloc[:-1].copy()
-            results['match_score'] = final_scores
-            
-            # Sort by score
-            recommendations = results.sort_values('match_score', ascending=False).head(limit)
-            
-            return recommendations[['id', 'match_score']].to_dict('records')
+            # Get potential matches (exclude self), bounded by CANDIDATE_LIMIT
+            candidates = self.store.get_candidates(user_id)
+            return self.rank(target_user, candidates, limit)
         except Exception as e:
             print(f"Recommendation error: {e}")
             return []
+
+    @staticmethod
+    def build_results(recommendations, users):
+        """
+        Join ranked ids with their display fields, keeping rank order.
+        """
+        users_by_id = {str(user['_id']): user for user in users}
+
+        results = []
+        for rec in recommendations:
+            user = users_by_id.get(rec['id'])
+            if user:
+                results.append({
+                    '_id': rec['id'],
+                    'displayName': user.get('displayName'),
+                    'age': user.get('age'),
+                    'photos': user.get('photos') or [],
+                    'match_score': round(rec['match_score'] * 100, 1)
+                })
+        return results
+
+    def hydrate(self, recommendations):
+        """
+        Fetch display fields for recommended users in one query.
+        """
+        users = self.store.get_users([rec['id'] for rec in recommendations], RESULT_FIELDS)
+        return self.build_results(recommendations, users)
@@ -0,0 +1,156 @@
+"""
+Framework-agnostic scoring primitives shared by the Flask and Django apps.
+
+Everything here works on numpy arrays so a whole candidate batch is scored
+in one pass.
+"""
+import numpy as np
+
+DEFAULT_ELO = 1200
+
+# Weights: 70% Content (Interests/Bio), 30% ELO (Desirability)
+CONTENT_WEIGHT = 0.7
+ELO_WEIGHT = 0.3
+
+# Neutral similarity used when TF-IDF cannot be computed (e.g. empty vocabulary)
+FALLBACK_SIMILARITY = 0.5
+
+
+def text_features(profile):
+    """
+    Combine the free-text profile fields used for content-based filtering.
+    """
+    interests = profile.get('interests') or []
+    interests_str = ' '.join(interests) if isinstance(interests, list) else ''
+
+    return f"{profile.get('bio') or ''} {profile.get('occupation') or ''} {profile.get('education') or ''} {interests_str}"
+
+
+def elo_of(profile):
+    elo = profile.get('elo_score')
+    return DEFAULT_ELO if elo is None else elo
+
+
+def content_similarity(vectorizer, target_text, candidate_texts):
+    """
+    Cosine similarity between the target text and every candidate text.
+    """
+    from sklearn.metrics.pairwise import linear_kernel
+
+    try:
+        tfidf_matrix = vectorizer.fit_transform(list(candidate_texts) + [target_text])
+        # TF-IDF rows are L2-normalised, so the dot product is the cosine similarity
+        return linear_kernel(tfidf_matrix[-1], tfidf_matrix[:-1]).ravel()
+    except ValueError:
+        # Fallback if TF-IDF fails
+        return np.full(len(candidate_texts), FALLBACK_SIMILARITY)
+
+
+def elo_similarity(candidate_elos, target_elo):
+    """
+    Users with similar ELO scores are more likely to match.
+    Lower difference is better, so the normalised difference is inverted.
+    """
+    return elo_similarity_matrix(candidate_elos, [target_elo])[0]
+
+
+def elo_similarity_matrix(candidate_elos, target_elos):
+    """
+    elo_similarity for many targets at once: one row per target, normalised
+    by that row's largest difference.
+    """
+    candidate_elos = np.asarray(candidate_elos, dtype=float)
+    target_elos = np.asarray(target_elos, dtype=float)
+
+    elo_diff = np.abs(candidate_elos[np.newaxis, :] - target_elos[:, np.newaxis])
+    max_diff = elo_diff.max(axis=1, keepdims=True) if elo_diff.shape[1] else np.ones((len(target_elos), 1))
+    max_diff[max_diff <= 0] = 1
+    return 1 - (elo_diff / (max_diff + 1))
+
+
+def tfidf_matrices(vectorizer, corpus, *text_lists):
+    """
+    Fit `vectorizer` on `corpus` and transform each list in `text_lists`.
+    Returns None when TF-IDF cannot be computed (e.g. empty vocabulary).
+    """
+    try:
+        vectorizer.fit(corpus)
+        return [vectorizer.transform(texts) for texts in text_lists]
+    except ValueError:
+        return None
+
+
+def content_similarity_block(target_matrix, candidate_matrix, shape):
+    """
+    Dense (targets x candidates) cosine similarity, or the neutral fallback
+    when `tfidf_matrices` failed.
+    """
+    from sklearn.metrics.pairwise import linear_kernel
+
+    if target_matrix is None:
+        return np.full(shape, FALLBACK_SIMILARITY)
+    return linear_kernel(target_matrix, candidate_matrix)
+
+
+def content_similarity_from_counts(target_counts, candidate_counts):
+    """
+    content_similarity computed from precomputed term counts: IDF is taken
+    over this candidate set plus the target, so the result matches fitting
+    a TfidfVectorizer on the same texts.
+    """
+    from scipy.sparse import csr_matrix, vstack
+    from sklearn.feature_extraction.text import TfidfTransformer
+    from sklearn.metrics.pairwise import linear_kernel
+
+    counts = vstack([candidate_counts, target_counts]).tocsr()
+    if counts.nnz == 0:
+        return np.full(candidate_counts.shape[0], FALLBACK_SIMILARITY)
+
+    # Keep only the columns present in this batch; absent terms don't change
+    # IDF or cosine, and hashed count matrices are ~1M columns wide
+    columns, remapped = np.unique(counts.indices, return_inverse=True)
+    counts = csr_matrix((counts.data, remapped.ravel(), counts.indptr), shape=(counts.shape[0], len(columns)))
+
+    tfidf_matrix = TfidfTransformer().fit_transform(counts)
+    return linear_kernel(tfidf_matrix[-1], tfidf_matrix[:-1]).ravel()
+
+
+def blend(content_scores, elo_scores):
+    """
+    Combine scores (weighted average).
+    """
+    return (CONTENT_WEIGHT * content_scores) + (ELO_WEIGHT * elo_scores)
+
+
+def top_k(scores, limit):
+    """
+    Indices of the `limit` best scores, highest first; ties keep index order.
+    """
+    return top_k_rows(np.asarray(scores)[np.newaxis, :], limit)[0]
+
+
+def top_k_rows(scores, limit):
+    """
+    top_k for every row of a 2-D score matrix: column indices, highest first.
+
+    Same result as np.argsort(-scores, axis=1, kind='stable')[:, :limit]
+    (tied scores keep column order), without sorting whole rows.
+    """
+    scores = np.asarray(scores)
+    rows, columns = scores.shape
+    if limit <= 0:
+        return np.empty((rows, 0), dtype=np.intp)
+    if limit >= columns:
+        return np.argsort(-scores, axis=1, kind='stable')
+
+    # k-th best score per row; everything better is in, ties at the cut
+    # are taken in column order until the row has `limit` entries
+    kth = -np.partition(-scores, limit - 1, axis=1)[:, limit - 1:limit]
+    better = scores > kth
+    tied = scores == kth
+    room = limit - better.sum(axis=1, keepdims=True)
+    keep = better | (tied & (np.cumsum(tied, axis=1) <= room))
+
+    selected = np.nonzero(keep)[1].reshape(rows, limit)
+    order = np.argsort(-np.take_along_axis(scores, selected, axis=1), axis=1, kind='stable')
+    return np.take_along_axis(selected, order, axis=1)
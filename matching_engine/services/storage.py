@@ -0,0 +1,83 @@
+"""
+Storage adapters for the matching core.
+
+The ranking and ELO code in this package only talks to a UserStore, so the
+same algorithm runs on top of PyMongo (Flask app) and Djongo (Django app).
+Every method returns plain dicts shaped like the MongoDB `users` documents.
+"""
+from bson import ObjectId
+import config
+
+# Fields the ranking algorithm reads from each candidate
+PROFILE_FIELDS = ('bio', 'occupation', 'education', 'interests', 'age', 'elo_score', 'location')
+
+# Fields returned to clients alongside a match score
+RESULT_FIELDS = ('displayName', 'age', 'photos')
+
+
+class UserStore:
+    """
+    Interface the matching core expects from a storage backend.
+    """
+
+    def get_user(self, user_id):
+        """Return the profile of a single user, or None."""
+        raise NotImplementedError
+
+    def get_candidates(self, user_id, limit=None):
+        """Return up to `limit` onboarded users other than `user_id`."""
+        raise NotImplementedError
+
+    def get_users(self, user_ids, fields=PROFILE_FIELDS):
+        """Return the profiles for `user_ids` in a single round trip (any order)."""
+        raise NotImplementedError
+
+    def set_elo_scores(self, scores):
+        """Persist a {user_id: elo_score} mapping."""
+        raise NotImplementedError
+
+
+class MongoUserStore(UserStore):
+    """
+    PyMongo backed store used by the Flask app.
+    """
+
+    def __init__(self, users_collection=None, candidates_collection=None):
+        if users_collection is None:
+            from database import users_collection
+        if candidates_collection is None:
+            from database import candidate_users_collection as candidates_collection
+        self.users = users_collection
+        # Candidate scans may be routed to secondaries (MONGO_READ_PREFERENCE_CANDIDATES)
+        self.candidates = candidates_collection
+
+    @staticmethod
+    def _projection(fields):
+        return {field: 1 for field in fields}
+
+    def get_user(self, user_id):
+        return self.users.find_one({'_id': ObjectId(user_id)}, self._projection(PROFILE_FIELDS))
+
+    def get_candidates(self, user_id, limit=None):
+        limit = config.CANDIDATE_LIMIT if limit is None else limit
+        cursor = self.candidates.find({
+            '_id': {'$ne': ObjectId(user_id)},
+            'onboardingCompleted': True
+        }, self._projection(PROFILE_FIELDS))
+        return list(cursor.limit(limit))
+
+    def get_users(self, user_ids, fields=PROFILE_FIELDS):
+        if not user_ids:
+            return []
+        object_ids = [ObjectId(user_id) for user_id in user_ids]
+        return list(self.users.find({'_id': {'$in': object_ids}}, self._projection(fields)))
+
+    def set_elo_scores(self, scores):
+        from pymongo import UpdateOne
+
+        if not scores:
+            return
+        self.users.bulk_write([
+            UpdateOne({'_id': ObjectId(user_id)}, {'$set': {'elo_score': int(elo)}})
+            for user_id, elo in scores.items()
+        ], ordered=False)
@@ -0,0 +1,104 @@
+from datetime import datetime, timedelta
+import mongomock
+import pytest
+from bson import ObjectId
+from services import decks
+
+
+class StubEngine:
+    def __init__(self, ranking):
+        self.ranking = ranking
+        self.live_calls = 0
+
+    def get_recommendations(self, user_id, limit=20):
+        self.live_calls += 1
+        return [{'id': candidate_id, 'match_score': score} for candidate_id, score in self.ranking[:limit]]
+
+    def hydrate(self, recommendations):
+        return recommendations
+
+
+def ranking(n):
+    return [(str(ObjectId()), round(1 - i / 100, 2)) for i in range(n)]
+
+
+@pytest.fixture
+def deck_store():
+    return decks.DeckStore(mongomock.MongoClient().db[decks.DECKS_COLLECTION])
+
+
+def test_cursor_round_trip():
+    cursor = decks.encode_cursor('abc', 40)
+    assert decks.decode_cursor(cursor) == ('abc', 40)
+
+
+@pytest.mark.parametrize('cursor', ['not-base64!', decks.encode_cursor('abc', -1), 'e30'])
+def test_invalid_cursor(cursor):
+    with pytest.raises(decks.InvalidCursor):
+        decks.decode_cursor(cursor)
+
+
+def test_versions_are_unique_per_build():
+    assert decks.deck_version() != decks.deck_version()
+
+
+def test_pages_follow_one_build(deck_store):
+    user_id = str(ObjectId())
+    items = ranking(5)
+    deck_store.save({user_id: items})
+
+    first = decks.get_deck_page(StubEngine([]), deck_store, user_id, limit=2)
+    second = decks.get_deck_page(StubEngine([]), deck_store, user_id, first['next_cursor'], limit=2)
+    third = decks.get_deck_page(StubEngine([]), deck_store, user_id, second['next_cursor'], limit=2)
+
+    pages = first['results'] + second['results'] + third['results']
+    assert [rec['id'] for rec in pages] == [candidate_id for candidate_id, _ in items]
+    assert third['next_cursor'] is None
+
+
+def test_same_day_rebuild_expires_cursor(deck_store):
+    user_id = str(ObjectId())
+    deck_store.save({user_id: ranking(5)})
+    first = decks.get_deck_page(StubEngine([]), deck_store, user_id, limit=2)
+
+    deck_store.save({user_id: ranking(5)})
+    with pytest.raises(decks.ExpiredCursor):
+        decks.get_deck_page(StubEngine([]), deck_store, user_id, first['next_cursor'], limit=2)
+
+
+def test_missing_deck_is_topped_up_live(deck_store):
+    user_id = str(ObjectId())
+    engine = StubEngine(ranking(3))
+
+    first = decks.get_deck_page(engine, deck_store, user_id, limit=2)
+    second = decks.get_deck_page(engine, deck_store, user_id, first['next_cursor'], limit=2)
+
+    assert engine.live_calls == 1
+    assert len(first['results']) == 2 and len(second['results']) == 1
+
+
+def test_stale_deck_is_treated_as_missing(deck_store):
+    user_id = str(ObjectId())
+    deck_store.save({user_id: ranking(3)})
+    deck_store.decks.update_one({'_id': ObjectId(user_id)}, {'$set': {'built_at': datetime.utcnow() - timedelta(days=3)}})
+    engine = StubEngine(ranking(3))
+
+    decks.get_deck_page(engine, deck_store, user_id, limit=2)
+
+    assert engine.live_calls == 1
+
+
+def test_stale_deck_expires_cursor(deck_store):
+    user_id = str(ObjectId())
+    deck_store.save({user_id: ranking(3)})
+    first = decks.get_deck_page(StubEngine([]), deck_store, user_id, limit=2)
+    deck_store.decks.update_one({'_id': ObjectId(user_id)}, {'$set': {'built_at': datetime.utcnow() - timedelta(days=3)}})
+
+    with pytest.raises(decks.ExpiredCursor):
+        decks.get_deck_page(StubEngine([]), deck_store, user_id, first['next_cursor'], limit=2)
+
+
+@pytest.mark.parametrize('limit', [0, -5])
+def test_non_positive_limit_rejected(deck_store, limit):
+    with pytest.raises(ValueError):
+        decks.get_deck_page(StubEngine([]), deck_store, str(ObjectId()), limit=limit)
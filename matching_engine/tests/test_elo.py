@@ -0,0 +1,53 @@
+import asyncio
+from bson import ObjectId
+from services import elo
+
+
+class MemoryStore:
+    def __init__(self, users):
+        self.users = {str(user['_id']): user for user in users}
+        self.writes = []
+
+    def get_users(self, user_ids, fields=None):
+        return [self.users[str(user_id)] for user_id in user_ids if str(user_id) in self.users]
+
+    def set_elo_scores(self, scores):
+        self.writes.append(scores)
+        for user_id, score in scores.items():
+            self.users[user_id]['elo_score'] = score
+
+
+class AsyncMemoryStore(MemoryStore):
+    async def get_users(self, user_ids, fields=None):
+        return MemoryStore.get_users(self, user_ids, fields)
+
+    async def set_elo_scores(self, scores):
+        MemoryStore.set_elo_scores(self, scores)
+
+
+def users():
+    return [{'_id': ObjectId(), 'elo_score': 1200}, {'_id': ObjectId()}]
+
+
+def test_equal_ratings_move_by_half_k():
+    assert elo.compute_elo_update(1200, 1200) == (1216, 1184)
+
+
+def test_sync_and_async_paths_agree():
+    sync_store, async_store = MemoryStore(users()), AsyncMemoryStore(users())
+    sync_ids = list(sync_store.users)
+    async_ids = list(async_store.users)
+
+    sync_result = elo.update_elo_ratings(sync_ids[0], sync_ids[1], store=sync_store)
+    async_result = asyncio.run(elo.update_elo_ratings_async(async_ids[0], async_ids[1], async_store))
+
+    assert sync_result == async_result == (1216, 1184)
+    assert sync_store.writes == [{sync_ids[0]: 1216, sync_ids[1]: 1184}]
+
+
+def test_missing_user_writes_nothing():
+    store = MemoryStore(users()[:1])
+    user_id = next(iter(store.users))
+
+    assert elo.update_elo_ratings(user_id, str(ObjectId()), store=store) == (None, None)
+    assert store.writes == []
@@ -0,0 +1,56 @@
+import numpy as np
+from sklearn.feature_extraction.text import TfidfVectorizer
+from services import scoring
+from services.feature_cache import FeatureCache, profile_key
+
+PROFILES = [
+    {'bio': 'Loves hiking and mountain trails', 'occupation': 'Engineer', 'interests': ['hiking', 'music']},
+    {'bio': 'Coffee, books and jazz', 'occupation': 'Writer', 'interests': ['music', 'books']},
+    {'bio': 'Marathon runner', 'education': 'State University', 'interests': ['running', 'hiking']},
+    {'bio': '', 'interests': []},
+]
+
+
+def test_key_ignores_non_text_fields():
+    profile = dict(PROFILES[0], elo_score=1200)
+
+    assert profile_key(profile) == profile_key(dict(profile, elo_score=1500, age=30))
+    assert profile_key(profile) != profile_key(dict(profile, bio='Changed bio'))
+
+
+def test_only_misses_are_counted_and_stored():
+    cache = FeatureCache(max_entries=10)
+
+    cache.transform(PROFILES)
+    cache.transform(PROFILES[:2])
+
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (2, 4, 4)
+    assert stats['memory_bytes'] > 0
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = FeatureCache(max_entries=2)
+
+    cache.transform(PROFILES[:2])
+    cache.transform(PROFILES[:1])
+    cache.transform(PROFILES[2:3])
+    cache.transform(PROFILES[:1])
+
+    stats = cache.stats()
+    assert stats['entries'] == 2 and stats['evictions'] == 1
+    assert stats['hits'] == 2
+
+
+def test_scores_match_tfidf_vectorizer():
+    cache = FeatureCache()
+    target, candidates = PROFILES[0], PROFILES[1:]
+
+    cached = scoring.content_similarity_from_counts(cache.transform([target]), cache.transform(candidates))
+    live = scoring.content_similarity(
+        TfidfVectorizer(stop_words='english'),
+        scoring.text_features(target),
+        [scoring.text_features(profile) for profile in candidates]
+    )
+
+    np.testing.assert_allclose(cached, live, atol=1e-6)
@@ -0,0 +1,52 @@
+import os
+import numpy as np
+from bson import ObjectId
+from sklearn.feature_extraction.text import TfidfVectorizer
+from services import scoring
+from services.feature_snapshot import FeatureSnapshot, build_snapshot
+
+BIOS = [
+    'Hiking, coffee and long trail runs',
+    'Jazz records and coffee shops',
+    'Books, dogs and travel',
+    'Trail runner who loves dogs',
+]
+
+
+def live_scores(target, candidates):
+    content = scoring.content_similarity(
+        TfidfVectorizer(stop_words='english'),
+        scoring.text_features(target),
+        [scoring.text_features(user) for user in candidates]
+    )
+    elo = scoring.elo_similarity(np.array([scoring.elo_of(user) for user in candidates], dtype=float), scoring.elo_of(target))
+    return scoring.blend(content, elo)
+
+
+def make_snapshot(tmp_path):
+    users = [
+        {'_id': ObjectId(), 'bio': bio, 'onboardingCompleted': True, 'elo_score': 1100 + 50 * i}
+        for i, bio in enumerate(BIOS)
+    ]
+    version = build_snapshot(users, str(tmp_path), keep=1)
+    return FeatureSnapshot(os.path.join(str(tmp_path), version)), sorted(users, key=lambda user: user['_id'])
+
+
+def test_snapshot_user_matches_live(tmp_path):
+    snapshot, users = make_snapshot(tmp_path)
+    target_row = snapshot.row_of(users[0]['_id'])
+    rows = snapshot.candidate_rows(exclude_row=target_row)
+
+    scores = snapshot.score(snapshot.counts[target_row], float(snapshot.elo[target_row]), rows)
+
+    np.testing.assert_allclose(scores, live_scores(users[0], [users[row] for row in rows]), atol=1e-9)
+
+
+def test_new_user_with_unseen_terms_matches_live(tmp_path):
+    snapshot, users = make_snapshot(tmp_path)
+    new_user = {'_id': ObjectId(), 'bio': 'Coffee and zymurgy, lots of zymurgy', 'elo_score': 1180}
+    rows = snapshot.candidate_rows()
+
+    scores = snapshot.score(snapshot.vectorize(scoring.text_features(new_user)), scoring.elo_of(new_user), rows)
+
+    np.testing.assert_allclose(scores, live_scores(new_user, [users[row] for row in rows]), atol=1e-9)
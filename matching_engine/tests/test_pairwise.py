@@ -0,0 +1,34 @@
+import pytest
+from bson import ObjectId
+from services import pairwise
+
+
+def test_single_user_request():
+    user_id, candidate_id = str(ObjectId()), str(ObjectId())
+
+    assert pairwise.parse_request({'user_id': user_id, 'candidate_ids': [candidate_id, candidate_id]}) == (
+        [user_id], [candidate_id], False
+    )
+
+
+def test_multi_user_request_streams():
+    user_ids = [str(ObjectId()), str(ObjectId())]
+
+    assert pairwise.parse_request({'user_ids': user_ids, 'candidate_ids': user_ids})[2] is True
+
+
+@pytest.mark.parametrize('body', [None, [], ['a'], 'text', 42, {}])
+def test_non_object_body_rejected(body):
+    with pytest.raises(pairwise.PairwiseRequestError):
+        pairwise.parse_request(body)
+
+
+@pytest.mark.parametrize('body', [
+    {'user_id': 'bad', 'candidate_ids': [str(ObjectId())]},
+    {'user_ids': [str(ObjectId()), 'bad'], 'candidate_ids': [str(ObjectId())]},
+    {'user_id': str(ObjectId()), 'candidate_ids': [str(ObjectId()), 'bad']},
+    {'user_id': str(ObjectId()), 'candidate_ids': [123]},
+])
+def test_malformed_id_rejected(body):
+    with pytest.raises(pairwise.PairwiseRequestError):
+        pairwise.parse_request(body)
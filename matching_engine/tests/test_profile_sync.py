@@ -0,0 +1,62 @@
+from bson import ObjectId
+from services import profile_sync
+from services.profile_cache import ProfileCache
+
+
+class StubStore:
+    def __init__(self, users):
+        self.users = users
+
+    def get_user(self, user_id):
+        return next((user for user in self.users if str(user['_id']) == str(user_id)), None)
+
+    def get_candidates(self, user_id, limit=None):
+        return [user for user in self.users if str(user['_id']) != str(user_id)]
+
+    def get_users(self, user_ids, fields=None):
+        return [user for user in self.users if str(user['_id']) in set(map(str, user_ids))]
+
+
+class StubWatcher:
+    started = 0
+
+    def __init__(self, cache, db):
+        self.cache = cache
+
+    def start(self):
+        StubWatcher.started += 1
+
+
+def make_users(n):
+    return [{'_id': ObjectId(), 'bio': 'hiking', 'onboardingCompleted': True} for _ in range(n)]
+
+
+def test_reads_fall_back_until_first_load():
+    users = make_users(3)
+    cache = ProfileCache(backing_store=StubStore(users))
+
+    assert len(cache.get_candidates(users[0]['_id'])) == 2
+    assert cache.get_user(users[1]['_id'])['bio'] == 'hiking'
+
+    cache.load(users[:2])
+
+    assert cache.loaded
+    assert len(cache.get_candidates(users[0]['_id'])) == 1
+    assert cache.get_user(users[2]['_id']) is None
+
+
+def test_watcher_is_started_once_per_process(monkeypatch):
+    monkeypatch.setattr(profile_sync, 'ProfileSyncWatcher', StubWatcher)
+    monkeypatch.setattr(profile_sync, '_state', {'pid': None, 'watcher': None})
+    StubWatcher.started = 0
+    cache = ProfileCache()
+
+    first = profile_sync.ensure_watcher(cache, db_factory=lambda: None)
+    assert profile_sync.ensure_watcher(cache, db_factory=lambda: None) is first
+    assert StubWatcher.started == 1
+
+    # A forked worker sees a different pid and starts its own watcher
+    monkeypatch.setattr(profile_sync.os, 'getpid', lambda: -1)
+    assert profile_sync.current_watcher() is None
+    assert profile_sync.ensure_watcher(cache, db_factory=lambda: None) is not first
+    assert StubWatcher.started == 2
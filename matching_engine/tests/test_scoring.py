@@ -0,0 +1,36 @@
+import numpy as np
+from services import scoring
+
+
+def test_top_k_rows_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.random((4, 50))
+
+    top = scoring.top_k_rows(scores, 5)
+
+    expected = np.argsort(-scores, axis=1, kind='stable')[:, :5]
+    np.testing.assert_array_equal(top, expected)
+
+
+def test_top_k_rows_limit_larger_than_row():
+    scores = np.array([[0.1, 0.9, 0.5]])
+
+    np.testing.assert_array_equal(scoring.top_k_rows(scores, 10), [[1, 2, 0]])
+
+
+def test_top_k_rows_ties_keep_column_order():
+    scores = np.array([[0.5, 0.7, 0.5, 0.7]])
+
+    np.testing.assert_array_equal(scoring.top_k_rows(scores, 3), [[1, 3, 0]])
+
+
+def test_top_k_rows_is_tie_stable_on_tie_heavy_rows():
+    rng = np.random.default_rng(1)
+    for _ in range(200):
+        scores = rng.integers(0, 4, (5, 30)) / 4
+        scores[:, rng.integers(0, 30)] = -np.inf
+        limit = int(rng.integers(1, 30))
+
+        expected = np.argsort(-scores, axis=1, kind='stable')[:, :limit]
+        np.testing.assert_array_equal(scoring.top_k_rows(scores, limit), expected)
+        np.testing.assert_array_equal(scoring.top_k(scores[0], limit), expected[0])
@@ -4,8 +4,9 @@ Flask API for face verification using OpenCV and dlib
 """
 from flask import Flask, request, jsonify
 from flask_cors import CORS
-from services.face_verification import verify_face
-from config import PORT, DEBUG
+from services.verification_cache import verify_face_cached, cache_stats
+from config import PORT, DEBUG, FACE_INDEX_ENABLED
+from database import pool_stats
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -20,6 +21,27 @@ def health_check():
     })
 
 
+@app.route('/health/pool', methods=['GET'])
+def pool_health():
+    """MongoDB connection pool statistics for this worker process"""
+    return jsonify(pool_stats())
+
+
+@app.route('/health/verification-cache', methods=['GET'])
+def verification_cache_health():
+    """Hit/miss/coalesced counters of this worker's verification result cache"""
+    return jsonify(cache_stats())
+
+
+@app.route('/health/face-index', methods=['GET'])
+def face_index_health():
+    """Size and memory footprint of this worker's face embedding index"""
+    if not FACE_INDEX_ENABLED:
+        return jsonify({'enabled': False})
+    from services.face_index import get_face_index
+    return jsonify(dict(get_face_index().stats(), enabled=True))
+
+
 @app.route('/api/verify-face', methods=['POST'])
 def verify_face_endpoint():
     """
@@ -80,7 +102,7 @@ def verify_face_endpoint():
         
         # Verify face
         print(f"Calling verify_face for user: {user_id}")
-        result = verify_face(user_id, selfie_base64)
+        result = verify_face_cached(user_id, selfie_base64)
         
         print(f"Verification result: verified={result.get('verified')}, error={result.get('error')}, message={result.get('message')}")
         
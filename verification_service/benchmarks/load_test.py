@@ -0,0 +1,341 @@
+"""
+Verification Service Load Test
+Self-contained load generator for /api/verify-face.
+
+It builds a fixture corpus from a directory of face photos (one directory per
+person, same layout as benchmarks/profile_photo_resolution.py), serves the
+profile photos from a local HTTP server, seeds users whose `photos` point at
+that server (in mongomock by default, or a real mongod with --mongodb-uri),
+starts the service in a child process and fires concurrent verification
+traffic per scenario:
+
+    good        selfie of the user, profile photos of the same person
+    no_face     selfie without a face
+    multi_face  two faces side by side
+    huge        selfie and profile photos upscaled to --huge-dimension
+
+For each scenario it reports throughput, latency percentiles and the
+service process's CPU utilisation and peak RSS.
+
+    python benchmarks/load_test.py faces/ --concurrency 1,4,16 --requests 100
+"""
+import argparse
+import base64
+import functools
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SERVICE_DIR)
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+SCENARIOS = ('good', 'no_face', 'multi_face', 'huge')
+
+# Expected `error` per scenario; anything else counts as a failed request
+EXPECTED_ERRORS = {
+    'good': (None,),
+    'no_face': ('NO_FACE_IN_SELFIE',),
+    'multi_face': ('MULTIPLE_FACES_IN_SELFIE',),
+    'huge': (None,),
+}
+
+
+# --- Fixture corpus ---
+
+def _jpeg(image, quality=90):
+    buffer = io.BytesIO()
+    image.convert('RGB').save(buffer, 'JPEG', quality=quality)
+    return buffer.getvalue()
+
+
+def build_corpus(faces_dir, out_dir, huge_dimension):
+    """
+    Derive selfies and profile photos for every scenario from `faces_dir`.
+
+    Returns {scenario: [(selfie_bytes, [profile photo file names])]}.
+    """
+    from PIL import Image
+
+    photos_dir = os.path.join(out_dir, 'photos')
+    os.makedirs(photos_dir, exist_ok=True)
+
+    people = {}
+    for person in sorted(os.listdir(faces_dir)):
+        person_dir = os.path.join(faces_dir, person)
+        if os.path.isdir(person_dir):
+            files = [os.path.join(person_dir, name) for name in sorted(os.listdir(person_dir))
+                     if name.lower().endswith(IMAGE_EXTENSIONS)]
+            if len(files) >= 2:
+                people[person] = files
+    if len(people) < 2:
+        raise SystemExit('need at least two people with two or more photos each')
+
+    def save_photo(name, image):
+        with open(os.path.join(photos_dir, name), 'wb') as f:
+            f.write(_jpeg(image))
+        return name
+
+    corpus = {scenario: [] for scenario in SCENARIOS}
+    names = list(people)
+    for index, person in enumerate(names):
+        selfie = Image.open(people[person][0]).convert('RGB')
+        profile_images = [Image.open(path).convert('RGB') for path in people[person][1:]]
+        profile_names = [save_photo(f"{person}_{n}.jpg", image) for n, image in enumerate(profile_images)]
+
+        corpus['good'].append((_jpeg(selfie), profile_names))
+        corpus['no_face'].append((_jpeg(Image.effect_noise(selfie.size, 64)), profile_names))
+
+        other = Image.open(people[names[(index + 1) % len(names)]][0]).convert('RGB').resize(selfie.size)
+        pair = Image.new('RGB', (selfie.width * 2, selfie.height))
+        pair.paste(selfie, (0, 0))
+        pair.paste(other, (selfie.width, 0))
+        corpus['multi_face'].append((_jpeg(pair), profile_names))
+
+        scale = huge_dimension / max(selfie.size)
+        huge_selfie = selfie.resize((int(selfie.width * scale), int(selfie.height * scale)), Image.Resampling.BICUBIC)
+        huge_names = [
+            save_photo(f"{person}_{n}_huge.jpg", image.resize(
+                (int(image.width * huge_dimension / max(image.size)), int(image.height * huge_dimension / max(image.size))),
+                Image.Resampling.BICUBIC
+            ))
+            for n, image in enumerate(profile_images)
+        ]
+        corpus['huge'].append((_jpeg(huge_selfie), huge_names))
+
+    return corpus
+
+
+def serve_photos(directory):
+    handler = functools.partial(QuietHandler, directory=directory)
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+# --- Service process ---
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def run_service(port, seed_path, use_mongomock):
+    """
+    Child process entry point: seed the database, then serve the Flask app.
+    """
+    import database
+
+    if use_mongomock:
+        import mongomock
+        mock_db = mongomock.MongoClient().get_database('load_test')
+        database.get_collection = lambda name: mock_db[name]
+
+    from bson import json_util
+    with open(seed_path) as f:
+        users = json_util.loads(f.read())
+    database.users_collection.delete_many({'_id': {'$in': [user['_id'] for user in users]}})
+    database.users_collection.insert_many(users)
+
+    import app as service
+    from werkzeug.serving import make_server
+    make_server('127.0.0.1', port, service.app, threaded=True).serve_forever()
+
+
+def start_service(corpus, photo_base_url, workdir, use_mongomock):
+    from bson import ObjectId, json_util
+
+    users, requests_by_scenario = [], {}
+    for scenario, cases in corpus.items():
+        requests_by_scenario[scenario] = []
+        for selfie, photo_names in cases:
+            user_id = ObjectId()
+            users.append({
+                '_id': user_id,
+                'displayName': f'load-test-{scenario}',
+                'photos': [f"{photo_base_url}/photos/{name}" for name in photo_names],
+                'onboardingCompleted': True,
+            })
+            requests_by_scenario[scenario].append((str(user_id), selfie))
+
+    seed_path = os.path.join(workdir, 'users.json')
+    with open(seed_path, 'w') as f:
+        f.write(json_util.dumps(users))
+
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, os.path.abspath(__file__), '--serve', str(port), seed_path]
+        + (['--mongomock'] if use_mongomock else []),
+        cwd=SERVICE_DIR,
+        stdout=subprocess.DEVNULL,
+        env=dict(os.environ, DEBUG='False'),
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 60
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/health", timeout=1).read()
+            return process, base_url, requests_by_scenario
+        except OSError:
+            if process.poll() is not None:
+                raise SystemExit('verification service exited during startup')
+            time.sleep(0.5)
+    process.kill()
+    raise SystemExit('verification service did not start')
+
+
+# --- Measurement ---
+
+class ProcessSampler(threading.Thread):
+    """
+    Samples CPU time and RSS of the service process from /proc.
+    """
+
+    def __init__(self, pid, interval=0.2):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak_rss = 0
+        self._stop_event = threading.Event()
+
+    def cpu_seconds(self):
+        with open(f"/proc/{self.pid}/stat") as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / os.sysconf('SC_CLK_TCK')
+
+    def rss_bytes(self):
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+        return 0
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak_rss = max(self.peak_rss, self.rss_bytes())
+
+    def stop(self):
+        self._stop_event.set()
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))]
+
+
+def verify(base_url, user_id, selfie, unique):
+    if unique:
+        # Trailing bytes after the JPEG EOI marker are ignored by decoders but
+        # change the content hash, so the verification cache never hits
+        selfie = selfie + os.urandom(16)
+    body = json.dumps({'userId': user_id, 'selfieImageBase64': base64.b64encode(selfie).decode()}).encode()
+    req = urllib.request.Request(f"{base_url}/api/verify-face", data=body, headers={'Content-Type': 'application/json'})
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(req, timeout=120) as response:
+            payload = json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        payload = json.loads(e.read() or b'{}')
+    except OSError:
+        payload = {'error': 'CONNECTION_ERROR'}
+    return time.perf_counter() - start, payload.get('error')
+
+
+def run_scenario(base_url, scenario, cases, concurrency, total, sampler, unique):
+    jobs = [random.choice(cases) for _ in range(total)]
+    rss_before = sampler.rss_bytes()
+    sampler.peak_rss = rss_before
+    cpu_before = sampler.cpu_seconds()
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(lambda job: verify(base_url, job[0], job[1], unique), jobs))
+
+    wall = time.perf_counter() - started
+    cpu = sampler.cpu_seconds() - cpu_before
+    latencies = sorted(latency for latency, _ in results)
+    failures = sum(error not in EXPECTED_ERRORS[scenario] for _, error in results)
+
+    return {
+        'scenario': scenario,
+        'concurrency': concurrency,
+        'requests': total,
+        'unexpected_results': failures,
+        'throughput_rps': round(total / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+        'p90_ms': round(percentile(latencies, 90) * 1000, 1),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+        'max_ms': round(latencies[-1] * 1000, 1),
+        'cpu_utilisation_cores': round(cpu / wall, 2),
+        'rss_start_mb': round(rss_before / 2**20, 1),
+        'rss_peak_mb': round(sampler.peak_rss / 2**20, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('faces', nargs='?', help='directory with one sub-directory of face photos per person')
+    parser.add_argument('--scenarios', default=','.join(SCENARIOS))
+    parser.add_argument('--concurrency', default='1,4,16', help='comma separated concurrency levels')
+    parser.add_argument('--requests', type=int, default=50, help='requests per scenario and concurrency level')
+    parser.add_argument('--huge-dimension', type=int, default=6000)
+    parser.add_argument('--mongodb-uri', help='seed a real mongod instead of mongomock')
+    parser.add_argument('--allow-cache', action='store_true', help='resend identical selfies (measures cache hits)')
+    parser.add_argument('--serve', nargs=2, metavar=('PORT', 'SEED'), help=argparse.SUPPRESS)
+    parser.add_argument('--mongomock', action='store_true', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve:
+        run_service(int(args.serve[0]), args.serve[1], args.mongomock)
+        return
+
+    if not args.faces:
+        parser.error('faces directory is required')
+    if args.mongodb_uri:
+        os.environ['MONGODB_URI'] = args.mongodb_uri
+
+    with tempfile.TemporaryDirectory(prefix='verify-load-') as workdir:
+        print('Building fixture corpus...', file=sys.stderr)
+        corpus = build_corpus(args.faces, workdir, args.huge_dimension)
+        photo_server = serve_photos(workdir)
+        photo_base_url = f"http://127.0.0.1:{photo_server.server_address[1]}"
+
+        process, base_url, requests_by_scenario = start_service(corpus, photo_base_url, workdir, not args.mongodb_uri)
+        sampler = ProcessSampler(process.pid)
+        sampler.start()
+        try:
+            report = []
+            for scenario in args.scenarios.split(','):
+                for concurrency in (int(level) for level in args.concurrency.split(',')):
+                    result = run_scenario(base_url, scenario, requests_by_scenario[scenario], concurrency,
+                                          args.requests, sampler, unique=not args.allow_cache)
+                    print(json.dumps(result), file=sys.stderr)
+                    report.append(result)
+            print(json.dumps(report, indent=2))
+        finally:
+            sampler.stop()
+            process.terminate()
+            process.wait(timeout=10)
+            photo_server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+Profile Photo Resolution Benchmark
+Measures the speed/accuracy tradeoff of bounded-resolution profile photo
+decoding (decode_profile_photo) against the previous full-resolution path.
+
+Fixture layout: one directory per person, any number of photos each:
+
+    fixtures/
+        alice/1.jpg  alice/2.jpg
+        bob/1.jpg    ...
+
+    python benchmarks/profile_photo_resolution.py fixtures/
+    PROFILE_PHOTO_DETECTION_MAX_DIMENSION=640 python benchmarks/profile_photo_resolution.py fixtures/
+
+Reports per-photo decode+encode time, face-count agreement, drift between
+the two paths' encodings and, over every photo pair, the match rate for the
+same person and the false-match rate for different people at
+FACE_VERIFICATION_DISTANCE_THRESHOLD.
+"""
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import face_recognition  # noqa: E402
+from PIL import Image  # noqa: E402
+from config import (  # noqa: E402
+    FACE_VERIFICATION_DISTANCE_THRESHOLD,
+    PROFILE_PHOTO_DETECTION_MAX_DIMENSION,
+    PROFILE_PHOTO_ENCODE_MAX_DIMENSION,
+)
+from services.face_verification import decode_profile_photo, get_face_encodings  # noqa: E402
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def full_resolution(data):
+    image = Image.open(io.BytesIO(data))
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    return get_face_encodings(image)
+
+
+def bounded_resolution(data):
+    image, detection_image = decode_profile_photo(data)
+    return get_face_encodings(image, detection_image=detection_image)
+
+
+def run_path(fn, data):
+    # get_face_encodings logs every step; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        encodings = fn(data)
+        return encodings, time.perf_counter() - start
+
+
+def pair_rates(photos, key):
+    same, different = [], []
+    singles = [(person, result[key][0]) for person, result in photos if len(result[key]) == 1]
+    for (person_a, enc_a), (person_b, enc_b) in itertools.combinations(singles, 2):
+        match = face_recognition.face_distance([enc_a], enc_b)[0] <= FACE_VERIFICATION_DISTANCE_THRESHOLD
+        (same if person_a == person_b else different).append(match)
+    return {
+        'same_person_pairs': len(same),
+        'same_person_match_rate': round(sum(same) / len(same), 4) if same else None,
+        'different_person_pairs': len(different),
+        'false_match_rate': round(sum(different) / len(different), 4) if different else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixtures')
+    args = parser.parse_args()
+
+    photos = []
+    for person in sorted(os.listdir(args.fixtures)):
+        person_dir = os.path.join(args.fixtures, person)
+        if not os.path.isdir(person_dir):
+            continue
+        for name in sorted(os.listdir(person_dir)):
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            with open(os.path.join(person_dir, name), 'rb') as f:
+                data = f.read()
+            full, full_time = run_path(full_resolution, data)
+            bounded, bounded_time = run_path(bounded_resolution, data)
+            photos.append((person, {'full': full, 'bounded': bounded, 'full_time': full_time, 'bounded_time': bounded_time}))
+
+    if not photos:
+        parser.error('no photos found')
+
+    drift = [
+        float(face_recognition.face_distance([result['full'][0]], result['bounded'][0])[0])
+        for _, result in photos
+        if len(result['full']) == 1 and len(result['bounded']) == 1
+    ]
+    full_times = [result['full_time'] for _, result in photos]
+    bounded_times = [result['bounded_time'] for _, result in photos]
+
+    report = {
+        'photos': len(photos),
+        'detection_max_dimension': PROFILE_PHOTO_DETECTION_MAX_DIMENSION,
+        'encode_max_dimension': PROFILE_PHOTO_ENCODE_MAX_DIMENSION,
+        'full_resolution': dict(
+            mean_ms=round(statistics.mean(full_times) * 1000, 1),
+            p95_ms=round(sorted(full_times)[int(0.95 * (len(full_times) - 1))] * 1000, 1),
+            **pair_rates(photos, 'full')
+        ),
+        'bounded_resolution': dict(
+            mean_ms=round(statistics.mean(bounded_times) * 1000, 1),
+            p95_ms=round(sorted(bounded_times)[int(0.95 * (len(bounded_times) - 1))] * 1000, 1),
+            **pair_rates(photos, 'bounded')
+        ),
+        'speedup': round(statistics.mean(full_times) / statistics.mean(bounded_times), 2),
+        'face_count_agreement': round(
+            sum(len(result['full']) == len(result['bounded']) for _, result in photos) / len(photos), 4
+        ),
+        'encoding_drift_mean': round(statistics.mean(drift), 4) if drift else None,
+        'encoding_drift_max': round(max(drift), 4) if drift else None,
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,65 @@
+"""
+Face Index Backfill
+Encodes profile photos of already-verified users that have no entry in
+`face_encodings` yet, then writes the local index snapshot so worker
+processes start without a full sync.
+
+    python build_face_index.py                 # backfill + snapshot
+    python build_face_index.py --snapshot-only
+"""
+import argparse
+import requests
+from database import users_collection, face_encodings_collection
+from config import FACE_INDEX_SNAPSHOT_PATH
+from services.face_index import FaceIndex, encoding_to_binary
+from services.face_verification import decode_profile_photo, get_face_encodings, profile_photo_url
+from datetime import datetime
+
+
+def backfill(limit_photos: int = 3) -> int:
+    indexed_users = set(face_encodings_collection.distinct('user_id'))
+    added = 0
+    for user in users_collection.find({'isVerified': True}, {'photos': 1}):
+        if user['_id'] in indexed_users:
+            continue
+        for photo_url in (user.get('photos') or [])[:limit_photos]:
+            try:
+                response = requests.get(profile_photo_url(photo_url), timeout=10)
+                if response.status_code != 200:
+                    continue
+                image, detection_image = decode_profile_photo(response.content)
+                encodings = get_face_encodings(image, detection_image=detection_image)
+                # Only single-face photos are unambiguous enough to index
+                if len(encodings) != 1:
+                    continue
+                face_encodings_collection.insert_one({
+                    'user_id': user['_id'],
+                    'encoding': encoding_to_binary(encodings[0]),
+                    'source': 'profile_photo',
+                    'created_at': datetime.utcnow()
+                })
+                added += 1
+                break
+            except Exception as e:
+                print(f"Error indexing photo {photo_url}: {str(e)}")
+    return added
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--snapshot-only', action='store_true')
+    parser.add_argument('--snapshot-path', default=FACE_INDEX_SNAPSHOT_PATH)
+    args = parser.parse_args()
+
+    if not args.snapshot_only:
+        print(f"Backfilled {backfill()} verified users")
+
+    index = FaceIndex()
+    index.load(args.snapshot_path)
+    index.sync(face_encodings_collection, force=True)
+    index.save(args.snapshot_path)
+    print(f"Snapshot written: {index.stats()}")
+
+
+if __name__ == '__main__':
+    main()
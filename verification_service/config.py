@@ -11,3 +11,27 @@ DEBUG = os.getenv('DEBUG', 'True') == 'True'
 FACE_VERIFICATION_THRESHOLD = float(os.getenv('FACE_VERIFICATION_THRESHOLD', '0.8'))  # 80% confidence
 FACE_VERIFICATION_DISTANCE_THRESHOLD = float(os.getenv('FACE_VERIFICATION_DISTANCE_THRESHOLD', '0.6'))  # Distance threshold for face-recognition
 
+
+# MongoDB connection pool (other PyMongo options, e.g. maxIdleTimeMS, can go in MONGODB_URI)
+MONGO_MAX_POOL_SIZE = int(os.getenv('MONGO_MAX_POOL_SIZE', 100))
+MONGO_MIN_POOL_SIZE = int(os.getenv('MONGO_MIN_POOL_SIZE', 0))
+MONGO_CONNECT_TIMEOUT_MS = int(os.getenv('MONGO_CONNECT_TIMEOUT_MS', 20000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv('MONGO_SERVER_SELECTION_TIMEOUT_MS', 30000))
+MONGO_COMPRESSORS = os.getenv('MONGO_COMPRESSORS', '')  # e.g. "zstd,snappy,zlib"
+MONGO_READ_PREFERENCE_DEFAULT = os.getenv('MONGO_READ_PREFERENCE_DEFAULT', 'primary')  # same name as matching_engine
+
+# Face embedding index (duplicate-account / photo-reuse detection)
+FACE_INDEX_ENABLED = os.getenv('FACE_INDEX_ENABLED', 'False') == 'True'
+FACE_INDEX_SNAPSHOT_PATH = os.getenv('FACE_INDEX_SNAPSHOT_PATH', 'face_index.npz')
+FACE_INDEX_SYNC_INTERVAL = float(os.getenv('FACE_INDEX_SYNC_INTERVAL', '30'))  # Seconds between catch-up syncs
+FACE_DUPLICATE_DISTANCE_THRESHOLD = float(os.getenv('FACE_DUPLICATE_DISTANCE_THRESHOLD', '0.45'))  # Stricter than verification
+FACE_DUPLICATE_MAX_RESULTS = int(os.getenv('FACE_DUPLICATE_MAX_RESULTS', '5'))
+
+# Verification result cache (idempotent retries)
+VERIFICATION_CACHE_TTL = float(os.getenv('VERIFICATION_CACHE_TTL', '600'))  # Seconds
+VERIFICATION_CACHE_MAX_ENTRIES = int(os.getenv('VERIFICATION_CACHE_MAX_ENTRIES', '1024'))
+
+# Profile photo preprocessing (detection runs on a downscaled copy; boxes are rescaled for encoding)
+PROFILE_PHOTO_DETECTION_MAX_DIMENSION = int(os.getenv('PROFILE_PHOTO_DETECTION_MAX_DIMENSION', '800'))
+PROFILE_PHOTO_ENCODE_MAX_DIMENSION = int(os.getenv('PROFILE_PHOTO_ENCODE_MAX_DIMENSION', '2000'))
+PROFILE_PHOTO_CLOUDINARY_RESIZE = os.getenv('PROFILE_PHOTO_CLOUDINARY_RESIZE', 'False') == 'True'  # Request c_limit variants
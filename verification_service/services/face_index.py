@@ -0,0 +1,251 @@
+"""
+Face Embedding Index
+Nearest-neighbour search over every verified user's 128-d face encoding,
+used to flag one person verifying several accounts or reusing someone
+else's photos.
+
+Encodings are persisted in the `face_encodings` collection (one document per
+encoding, float32 bytes) and mirrored in memory as one contiguous float32
+matrix with precomputed squared norms, so a query is a single matrix-vector
+product: ||a - b||^2 = ||a||^2 + ||b||^2 - 2 a.b. At 1M faces that is a
+512 MB matrix and a few tens of milliseconds per query on one core.
+
+Every worker process keeps its own copy and catches up with encodings added
+by other processes via `sync()` (incremental, by `_id`). A local .npz
+snapshot makes restarts cheap: load it, then sync only what is newer. The
+snapshot also keeps the ids already indexed within the sync overlap window,
+so the first sync after a load doesn't add them a second time.
+"""
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import numpy as np
+from bson import Binary, ObjectId
+from config import (
+    FACE_INDEX_SNAPSHOT_PATH,
+    FACE_INDEX_SYNC_INTERVAL,
+    FACE_DUPLICATE_DISTANCE_THRESHOLD,
+    FACE_DUPLICATE_MAX_RESULTS,
+)
+
+ENCODING_DIM = 128
+QUERY_CHUNK_ROWS = 262144
+SYNC_OVERLAP_SECONDS = 60
+
+
+def encoding_to_binary(encoding: np.ndarray) -> Binary:
+    return Binary(np.asarray(encoding, dtype='<f4').tobytes())
+
+
+def binary_to_encoding(data: bytes) -> np.ndarray:
+    return np.frombuffer(data, dtype='<f4')
+
+
+class FaceIndex:
+    def __init__(self, dim: int = ENCODING_DIM):
+        self.dim = dim
+        self._lock = threading.RLock()
+        self._encodings = np.empty((1024, dim), dtype=np.float32)
+        self._norms = np.empty(1024, dtype=np.float32)
+        self._owners = np.empty(1024, dtype='S24')
+        self._size = 0
+        self.last_id: Optional[ObjectId] = None
+        self._recent_ids = set()
+        self._synced_at = 0.0
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, extra: int):
+        needed = self._size + extra
+        capacity = len(self._owners)
+        if needed <= capacity:
+            return
+        # Amortised growth: double capacity so adds stay O(1) on average
+        while capacity < needed:
+            capacity *= 2
+        for name in ('_encodings', '_norms', '_owners'):
+            old = getattr(self, name)
+            new = np.empty((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self._size] = old[:self._size]
+            setattr(self, name, new)
+
+    def add(self, user_id: str, encodings: List[np.ndarray]):
+        """
+        Add one or more encodings belonging to `user_id` (in memory only).
+        """
+        if not len(encodings):
+            return
+        matrix = np.asarray(encodings, dtype=np.float32).reshape(-1, self.dim)
+        with self._lock:
+            self._reserve(len(matrix))
+            start, end = self._size, self._size + len(matrix)
+            self._encodings[start:end] = matrix
+            self._norms[start:end] = np.einsum('ij,ij->i', matrix, matrix)
+            self._owners[start:end] = str(user_id).encode()
+            self._size = end
+
+    def query(self, encoding: np.ndarray, threshold: float = None, exclude_user: str = None,
+              max_results: int = None) -> List[Dict]:
+        """
+        Closest users (one entry per user, best distance) within `threshold`.
+        """
+        threshold = FACE_DUPLICATE_DISTANCE_THRESHOLD if threshold is None else threshold
+        max_results = max_results or FACE_DUPLICATE_MAX_RESULTS
+        query = np.asarray(encoding, dtype=np.float32).reshape(self.dim)
+        query_norm = float(query @ query)
+        exclude = str(exclude_user).encode() if exclude_user else None
+
+        best: Dict[bytes, float] = {}
+        with self._lock:
+            size = self._size
+            encodings, norms, owners = self._encodings, self._norms, self._owners
+
+        for start in range(0, size, QUERY_CHUNK_ROWS):
+            end = min(start + QUERY_CHUNK_ROWS, size)
+            squared = norms[start:end] + query_norm - 2.0 * (encodings[start:end] @ query)
+            hits = np.flatnonzero(squared <= threshold * threshold)
+            for row in hits:
+                owner = owners[start + row]
+                if owner == exclude:
+                    continue
+                distance = float(np.sqrt(max(squared[row], 0.0)))
+                if distance < best.get(owner, np.inf):
+                    best[owner] = distance
+
+        matches = sorted(best.items(), key=lambda item: item[1])[:max_results]
+        return [{'userId': owner.decode(), 'distance': round(distance, 4)} for owner, distance in matches]
+
+    # --- Persistence ---
+
+    def _mark_seen(self, doc_id: ObjectId):
+        self._recent_ids.add(doc_id)
+        if self.last_id is None or doc_id > self.last_id:
+            self.last_id = doc_id
+
+    def sync(self, collection, force: bool = False) -> int:
+        """
+        Pull encodings added (by any process) since the last sync.
+
+        ObjectIds from different processes are only ordered to the second, so
+        each sync re-reads a short overlap window and skips ids it already has.
+        """
+        now = time.monotonic()
+        if not force and now - self._synced_at < FACE_INDEX_SYNC_INTERVAL:
+            return 0
+        self._synced_at = now
+
+        query = {}
+        if self.last_id:
+            lower = ObjectId.from_datetime(self.last_id.generation_time - timedelta(seconds=SYNC_OVERLAP_SECONDS))
+            query = {'_id': {'$gte': lower}}
+
+        # Fetch outside the lock so queries aren't blocked on network I/O
+        docs = list(collection.find(query, {'user_id': 1, 'encoding': 1}).sort('_id', 1))
+
+        added = 0
+        with self._lock:
+            # A concurrent sync may have advanced last_id (and pruned _recent_ids)
+            # since this fetch; anything before the current window is already indexed
+            floor = self.last_id.generation_time - timedelta(seconds=SYNC_OVERLAP_SECONDS) if self.last_id else None
+            for doc in docs:
+                if doc['_id'] in self._recent_ids or (floor and doc['_id'].generation_time < floor):
+                    continue
+                self.add(str(doc['user_id']), [binary_to_encoding(doc['encoding'])])
+                self._mark_seen(doc['_id'])
+                added += 1
+
+            if self.last_id:
+                cutoff = self.last_id.generation_time - timedelta(seconds=SYNC_OVERLAP_SECONDS)
+                self._recent_ids = {doc_id for doc_id in self._recent_ids if doc_id.generation_time >= cutoff}
+        return added
+
+    def save(self, path: str):
+        with self._lock:
+            size = self._size
+            arrays = {
+                'encodings': self._encodings[:size],
+                'owners': self._owners[:size],
+                'last_id': np.array(str(self.last_id) if self.last_id else '', dtype='S24'),
+                'recent_ids': np.array(sorted(str(doc_id) for doc_id in self._recent_ids), dtype='S24'),
+            }
+        tmp_path = f"{path}.tmp.npz"
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    def load(self, path: str) -> bool:
+        if not path or not os.path.exists(path):
+            return False
+        with np.load(path) as data:
+            encodings, owners, last_id = data['encodings'], data['owners'], data['last_id'].item()
+            recent_ids = data['recent_ids'] if 'recent_ids' in data.files else np.empty(0, dtype='S24')
+        with self._lock:
+            self._size = 0
+            self._reserve(len(owners))
+            self._encodings[:len(owners)] = encodings
+            self._norms[:len(owners)] = np.einsum('ij,ij->i', encodings, encodings)
+            self._owners[:len(owners)] = owners
+            self._size = len(owners)
+            self.last_id = ObjectId(last_id.decode()) if last_id else None
+            self._recent_ids = {ObjectId(doc_id.decode()) for doc_id in recent_ids}
+        return True
+
+    def stats(self) -> Dict:
+        return {
+            'faces': self._size,
+            'users': len(np.unique(self._owners[:self._size])),
+            'memory_bytes': int(self._encodings.nbytes + self._norms.nbytes + self._owners.nbytes),
+            'last_id': str(self.last_id) if self.last_id else None,
+        }
+
+
+_index: Optional[FaceIndex] = None
+_index_lock = threading.Lock()
+
+
+def get_face_index() -> FaceIndex:
+    """
+    Process-wide index: loaded from the local snapshot, then synced from MongoDB.
+    """
+    global _index
+    from database import face_encodings_collection
+
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = FaceIndex()
+                if index.load(FACE_INDEX_SNAPSHOT_PATH):
+                    print(f"Face index snapshot loaded: {len(index)} faces")
+                index.sync(face_encodings_collection, force=True)
+                _index = index
+    else:
+        _index.sync(face_encodings_collection)
+    return _index
+
+
+def find_duplicate_faces(user_id: str, encoding: np.ndarray) -> List[Dict]:
+    """
+    Other verified users whose face is within the duplicate distance threshold.
+    """
+    return get_face_index().query(encoding, exclude_user=user_id)
+
+
+def register_verified_face(user_id: str, encoding: np.ndarray):
+    """
+    Persist a verified user's encoding and add it to this process's index.
+    """
+    from database import face_encodings_collection
+
+    result = face_encodings_collection.insert_one({
+        'user_id': ObjectId(user_id),
+        'encoding': encoding_to_binary(encoding),
+        'source': 'selfie',
+        'created_at': datetime.utcnow()
+    })
+    index = get_face_index()
+    with index._lock:
+        index.add(user_id, [encoding])
+        # Our own insert is already indexed; don't re-add it on the next sync
+        index._mark_seen(result.inserted_id)
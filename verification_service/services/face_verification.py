@@ -6,10 +6,18 @@ import face_recognition
 import numpy as np
 from PIL import Image
 import io
+import math
 import base64
 from typing import List, Dict, Tuple, Optional
 from database import users_collection
-from config import FACE_VERIFICATION_THRESHOLD, FACE_VERIFICATION_DISTANCE_THRESHOLD
+from config import (
+    FACE_VERIFICATION_THRESHOLD,
+    FACE_VERIFICATION_DISTANCE_THRESHOLD,
+    FACE_INDEX_ENABLED,
+    PROFILE_PHOTO_DETECTION_MAX_DIMENSION,
+    PROFILE_PHOTO_ENCODE_MAX_DIMENSION,
+    PROFILE_PHOTO_CLOUDINARY_RESIZE,
+)
 from bson import ObjectId
 
 
@@ -53,13 +61,80 @@ def decode_base64_image(base64_string: str) -> Image.Image:
         raise ValueError(f"Failed to decode image: {str(e)}")
 
 
-def get_face_encodings(image: Image.Image, model: str = 'hog') -> List[np.ndarray]:
+def decode_profile_photo(image_data: bytes) -> Tuple[Image.Image, Image.Image]:
+    """
+    Decode a profile photo at bounded resolution for face detection
+    
+    JPEGs are decoded in draft mode, which lets the decoder scale by 1/2, 1/4
+    or 1/8 during DCT decoding: a 12MP (4032x3024) photo is decoded at
+    2016x1512 instead of producing every pixel.
+    
+    Returns:
+        Tuple of (encoding image capped at PROFILE_PHOTO_ENCODE_MAX_DIMENSION,
+                  detection image capped at PROFILE_PHOTO_DETECTION_MAX_DIMENSION)
+    """
+    image = Image.open(io.BytesIO(image_data))
+    
+    if image.format == 'JPEG' and max(image.size) > PROFILE_PHOTO_ENCODE_MAX_DIMENSION:
+        # The decoder only scales while both sides stay at least the requested box,
+        # so the box must follow the photo's aspect ratio (a square box never
+        # shrinks a 4:3 photo). The result is never smaller than the box.
+        scale = PROFILE_PHOTO_ENCODE_MAX_DIMENSION / max(image.size)
+        image.draft('RGB', (math.ceil(image.width * scale), math.ceil(image.height * scale)))
+    
+    if image.mode != 'RGB':
+        image = image.convert('RGB')
+    
+    if image.width > PROFILE_PHOTO_ENCODE_MAX_DIMENSION or image.height > PROFILE_PHOTO_ENCODE_MAX_DIMENSION:
+        image.thumbnail((PROFILE_PHOTO_ENCODE_MAX_DIMENSION, PROFILE_PHOTO_ENCODE_MAX_DIMENSION), Image.Resampling.LANCZOS)
+    
+    # HOG cost scales with pixel count, so detect on a smaller copy
+    detection_image = image
+    if image.width > PROFILE_PHOTO_DETECTION_MAX_DIMENSION or image.height > PROFILE_PHOTO_DETECTION_MAX_DIMENSION:
+        detection_image = image.copy()
+        detection_image.thumbnail((PROFILE_PHOTO_DETECTION_MAX_DIMENSION, PROFILE_PHOTO_DETECTION_MAX_DIMENSION), Image.Resampling.BILINEAR)
+    
+    return image, detection_image
+
+
+def profile_photo_url(photo_url: str) -> str:
+    """
+    Ask Cloudinary for a variant no larger than the encoding size (if enabled)
+    """
+    if PROFILE_PHOTO_CLOUDINARY_RESIZE and 'res.cloudinary.com' in photo_url and '/upload/' in photo_url:
+        size = PROFILE_PHOTO_ENCODE_MAX_DIMENSION
+        return photo_url.replace('/upload/', f'/upload/c_limit,w_{size},h_{size}/', 1)
+    return photo_url
+
+
+def scale_face_locations(face_locations: List[Tuple[int, int, int, int]], from_size: Tuple[int, int],
+                         to_size: Tuple[int, int]) -> List[Tuple[int, int, int, int]]:
+    """
+    Rescale (top, right, bottom, left) boxes found on one image size to another
+    """
+    scale_x = to_size[0] / from_size[0]
+    scale_y = to_size[1] / from_size[1]
+    return [
+        (
+            int(round(top * scale_y)),
+            min(to_size[0], int(round(right * scale_x))),
+            min(to_size[1], int(round(bottom * scale_y))),
+            int(round(left * scale_x))
+        )
+        for top, right, bottom, left in face_locations
+    ]
+
+
+def get_face_encodings(image: Image.Image, model: str = 'hog',
+                       detection_image: Optional[Image.Image] = None) -> List[np.ndarray]:
     """
     Detect faces and return face encodings from image
     
     Args:
         image: PIL Image
         model: Face detection model - 'hog' (faster, less accurate) or 'cnn' (slower, more accurate)
+        detection_image: Smaller copy of `image` to run detection on; boxes are
+            rescaled to `image` for encoding
     
     Returns:
         List of face encodings (128-dimensional vectors)
@@ -67,22 +142,26 @@ def get_face_encodings(image: Image.Image, model: str = 'hog') -> List[np.ndarra
     try:
         # Convert PIL Image to numpy array
         image_array = np.array(image)
-        print(f"Image shape: {image_array.shape}, dtype: {image_array.dtype}")
+        detection_array = np.array(detection_image) if detection_image is not None else image_array
+        print(f"Image shape: {image_array.shape}, detection shape: {detection_array.shape}, dtype: {image_array.dtype}")
         
         # Find face locations - try both models if first fails
-        face_locations = face_recognition.face_locations(image_array, model=model)
+        face_locations = face_recognition.face_locations(detection_array, model=model)
         print(f"Face locations found with {model} model: {len(face_locations)}")
         
         # If no faces found with default model and we used 'hog', try 'cnn'
         if len(face_locations) == 0 and model == 'hog':
             print("Trying CNN model (more accurate but slower)...")
-            face_locations = face_recognition.face_locations(image_array, model='cnn')
+            face_locations = face_recognition.face_locations(detection_array, model='cnn')
             print(f"Face locations found with cnn model: {len(face_locations)}")
         
         if len(face_locations) == 0:
             print("WARNING: No faces detected in image")
             return []
         
+        if detection_image is not None and detection_image.size != image.size:
+            face_locations = scale_face_locations(face_locations, detection_image.size, image.size)
+        
         print(f"Face locations: {face_locations}")
         
         # Get face encodings
@@ -123,13 +202,14 @@ def compare_faces(known_encoding: np.ndarray, unknown_encoding: np.ndarray, tole
     return is_match, confidence
 
 
-def verify_face(user_id: str, selfie_base64: str) -> Dict:
+def verify_face(user_id: str, selfie_base64: str, user: Optional[Dict] = None) -> Dict:
     """
     Verify user's selfie against their profile photos
     
     Args:
         user_id: User ID
         selfie_base64: Base64 encoded selfie image
+        user: Already-fetched user document (skips the database lookup)
     
     Returns:
         Dict with verification result:
@@ -139,6 +219,7 @@ def verify_face(user_id: str, selfie_base64: str) -> Dict:
             'message': str,
             'faces_found_in_selfie': int,
             'profile_photos_compared': int,
+            'profile_photos_failed': int (download/decode failures),
             'best_match_confidence': float
         }
     """
@@ -155,8 +236,9 @@ def verify_face(user_id: str, selfie_base64: str) -> Dict:
                 'error': 'INVALID_USER_ID'
             }
         
-        print(f"Looking up user with ObjectId: {user_object_id}")
-        user = users_collection.find_one({'_id': user_object_id})
+        if user is None:
+            print(f"Looking up user with ObjectId: {user_object_id}")
+            user = users_collection.find_one({'_id': user_object_id})
         
         if not user:
             print(f"ERROR: User not found with ID: {user_id}")
@@ -221,6 +303,7 @@ def verify_face(user_id: str, selfie_base64: str) -> Dict:
         best_confidence = 0
         best_match = False
         profile_photos_compared = 0
+        profile_photos_failed = 0
         all_confidences = []
         
         import requests
@@ -228,17 +311,16 @@ def verify_face(user_id: str, selfie_base64: str) -> Dict:
         for photo_url in profile_photos:
             try:
                 # Download profile photo
-                response = requests.get(photo_url, timeout=10)
+                response = requests.get(profile_photo_url(photo_url), timeout=10)
                 if response.status_code != 200:
+                    profile_photos_failed += 1
                     continue
                 
-                # Decode image
-                profile_image = Image.open(io.BytesIO(response.content))
-                if profile_image.mode != 'RGB':
-                    profile_image = profile_image.convert('RGB')
+                # Decode image at bounded resolution
+                profile_image, detection_image = decode_profile_photo(response.content)
                 
                 # Get face encodings from profile photo
-                profile_encodings = get_face_encodings(profile_image)
+                profile_encodings = get_face_encodings(profile_image, detection_image=detection_image)
                 
                 if len(profile_encodings) == 0:
                     continue  # Skip photos without faces
@@ -256,6 +338,7 @@ def verify_face(user_id: str, selfie_base64: str) -> Dict:
                 
             except Exception as e:
                 print(f"Error processing profile photo {photo_url}: {str(e)}")
+                profile_photos_failed += 1
                 continue
         
         if profile_photos_compared == 0:
@@ -277,17 +360,31 @@ def verify_face(user_id: str, selfie_base64: str) -> Dict:
         
         message = 'Face verification successful' if verified else f'Face verification failed. Confidence: {final_confidence:.1f}%. Minimum required: {FACE_VERIFICATION_THRESHOLD * 100:.0f}%'
         
-        return {
+        result = {
             'verified': verified,
             'confidence': round(final_confidence, 2),
             'average_confidence': round(avg_confidence, 2),
             'message': message,
             'faces_found_in_selfie': len(selfie_encodings),
             'profile_photos_compared': profile_photos_compared,
+            'profile_photos_failed': profile_photos_failed,
             'best_match_confidence': round(best_confidence, 2),
             'threshold': FACE_VERIFICATION_THRESHOLD * 100
         }
         
+        if FACE_INDEX_ENABLED:
+            # Same face already verified on other accounts? (checked before adding our own)
+            try:
+                from services.face_index import find_duplicate_faces, register_verified_face
+                
+                result['possible_duplicate_accounts'] = find_duplicate_faces(user_id, selfie_encoding)
+                if verified:
+                    register_verified_face(user_id, selfie_encoding)
+            except Exception as e:
+                print(f"Face index error: {str(e)}")
+        
+        return result
+        
     except Exception as e:
         return {
             'verified': False,
@@ -0,0 +1,144 @@
+"""
+Verification Result Cache
+Makes /api/verify-face idempotent for client retries and double taps.
+
+Results are keyed by (userId, SHA-256 of the decoded selfie bytes, SHA-256
+of the user's current photos list) and kept for VERIFICATION_CACHE_TTL
+seconds, so a retry with the same selfie returns immediately while a new
+selfie or changed profile photos always re-run verification. Results that
+may be transient (server errors, profile photos that failed to download or
+decode) are never cached. Concurrent
+requests for the same key are coalesced: one runs the pipeline, the rest
+wait for its result.
+
+The cache lives in process memory; each worker process has its own.
+"""
+import base64
+import binascii
+import copy
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Dict, Optional, Tuple
+from bson import ObjectId
+from database import users_collection
+from config import VERIFICATION_CACHE_TTL, VERIFICATION_CACHE_MAX_ENTRIES
+
+# Errors that may be transient (server failure, photo downloads) are never cached
+UNCACHEABLE_ERRORS = {'VERIFICATION_ERROR', 'NO_FACES_IN_PROFILE_PHOTOS'}
+
+
+def is_cacheable(result: Dict) -> bool:
+    """
+    Only cache results computed from every profile photo.
+    """
+    return result.get('error') not in UNCACHEABLE_ERRORS and not result.get('profile_photos_failed')
+
+
+class VerificationResultCache:
+    def __init__(self, ttl: float = VERIFICATION_CACHE_TTL, max_entries: int = VERIFICATION_CACHE_MAX_ENTRIES):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[Tuple, Tuple[float, Dict]]' = OrderedDict()
+        self._inflight: Dict[Tuple, Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_compute(self, key: Tuple, compute: Callable[[], Dict]) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return copy.deepcopy(entry[1])
+            if entry:
+                del self._entries[key]
+
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            return copy.deepcopy(future.result())
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if is_cacheable(result):
+                self._entries[key] = (time.monotonic() + self.ttl, result)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._inflight.pop(key, None)
+        future.set_result(result)
+        return copy.deepcopy(result)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'inflight': len(self._inflight),
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+            }
+
+
+_cache = VerificationResultCache()
+
+
+def selfie_digest(selfie_base64: str) -> Optional[str]:
+    """
+    SHA-256 of the decoded image bytes (ignores data URL prefix / base64 formatting).
+    """
+    try:
+        if ',' in selfie_base64:
+            selfie_base64 = selfie_base64.split(',')[1]
+        return hashlib.sha256(base64.b64decode(selfie_base64)).hexdigest()
+    except (binascii.Error, ValueError):
+        return None
+
+
+def photos_digest(photos) -> str:
+    return hashlib.sha256(json.dumps(photos or [], sort_keys=True).encode()).hexdigest()
+
+
+def verify_face_cached(user_id: str, selfie_base64: str) -> Dict:
+    """
+    verify_face with result caching and request coalescing
+    """
+    # Imported here so the cache itself doesn't pull in dlib/face_recognition
+    from services.face_verification import verify_face
+
+    digest = selfie_digest(selfie_base64)
+    try:
+        user = users_collection.find_one({'_id': ObjectId(user_id)})
+    except Exception:
+        user = None
+
+    # Invalid ids, unknown users and undecodable images take the normal path
+    if digest is None or user is None:
+        return verify_face(user_id, selfie_base64)
+
+    key = (str(user['_id']), digest, photos_digest(user.get('photos', [])))
+    return _cache.get_or_compute(key, lambda: verify_face(user_id, selfie_base64, user=user))
+
+
+def cache_stats() -> Dict:
+    return _cache.stats()
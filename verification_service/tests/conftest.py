@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The service modules use flat imports (`import config`, `from services import ...`)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,92 @@
+from datetime import datetime
+import mongomock
+import numpy as np
+import pytest
+from bson import ObjectId
+from services.face_index import ENCODING_DIM, FaceIndex, encoding_to_binary
+
+
+def random_encoding(rng):
+    return rng.normal(0, 0.1, ENCODING_DIM).astype(np.float32)
+
+
+@pytest.fixture
+def rng():
+    return np.random.default_rng(0)
+
+
+@pytest.fixture
+def collection():
+    return mongomock.MongoClient().db.face_encodings
+
+
+def insert(collection, user_id, encoding):
+    collection.insert_one({
+        'user_id': ObjectId(user_id),
+        'encoding': encoding_to_binary(encoding),
+        'created_at': datetime.utcnow()
+    })
+
+
+def test_query_finds_closest_user_within_threshold(rng):
+    index = FaceIndex()
+    alice, bob = str(ObjectId()), str(ObjectId())
+    face = random_encoding(rng)
+    index.add(alice, [face])
+    index.add(bob, [random_encoding(rng)])
+
+    matches = index.query(face + 0.01, threshold=0.5)
+
+    assert [match['userId'] for match in matches] == [alice]
+    assert matches[0]['distance'] == pytest.approx(0.01 * np.sqrt(ENCODING_DIM), abs=1e-3)
+
+
+def test_query_excludes_requesting_user_and_dedupes_owners(rng):
+    index = FaceIndex()
+    alice, bob = str(ObjectId()), str(ObjectId())
+    face = random_encoding(rng)
+    index.add(alice, [face])
+    index.add(bob, [face + 0.01, face + 0.02])
+
+    matches = index.query(face, threshold=0.5, exclude_user=alice)
+
+    assert [match['userId'] for match in matches] == [bob]
+
+
+def test_add_grows_past_initial_capacity(rng):
+    index = FaceIndex()
+    user_id = str(ObjectId())
+    index.add(user_id, [random_encoding(rng) for _ in range(1500)])
+
+    assert len(index) == 1500
+    assert index.stats()['users'] == 1
+
+
+def test_sync_is_incremental(rng, collection):
+    index = FaceIndex()
+    for _ in range(3):
+        insert(collection, str(ObjectId()), random_encoding(rng))
+
+    assert index.sync(collection, force=True) == 3
+    assert index.sync(collection, force=True) == 0
+
+    insert(collection, str(ObjectId()), random_encoding(rng))
+    assert index.sync(collection, force=True) == 1
+    assert len(index) == 4
+
+
+def test_load_sync_save_cycles_do_not_duplicate(rng, collection, tmp_path):
+    path = str(tmp_path / 'faces.npz')
+    for _ in range(5):
+        insert(collection, str(ObjectId()), random_encoding(rng))
+
+    for _ in range(3):
+        index = FaceIndex()
+        index.load(path)
+        index.sync(collection, force=True)
+        index.save(path)
+
+    restored = FaceIndex()
+    assert restored.load(path)
+    assert len(restored) == 5
+    assert restored.sync(collection, force=True) == 0
@@ -0,0 +1,137 @@
+import base64
+import threading
+import time
+import pytest
+from services import verification_cache
+from services.verification_cache import VerificationResultCache, selfie_digest
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(verification_cache.time, 'monotonic', clock)
+    return clock
+
+
+def counting(result):
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return dict(result)
+    return compute, calls
+
+
+def test_hit_within_ttl_and_recompute_after(clock):
+    cache = VerificationResultCache(ttl=60, max_entries=10)
+    compute, calls = counting({'verified': True})
+
+    cache.get_or_compute(('u', 's', 'p'), compute)
+    clock.now += 59
+    cache.get_or_compute(('u', 's', 'p'), compute)
+    assert len(calls) == 1
+
+    clock.now += 2
+    cache.get_or_compute(('u', 's', 'p'), compute)
+    assert len(calls) == 2
+    assert cache.stats()['hits'] == 1 and cache.stats()['misses'] == 2
+
+
+def test_results_are_copies(clock):
+    cache = VerificationResultCache(ttl=60, max_entries=10)
+    compute, _ = counting({'verified': True, 'details': {'faces': 1}})
+
+    first = cache.get_or_compute('key', compute)
+    first['details']['faces'] = 99
+
+    assert cache.get_or_compute('key', compute)['details']['faces'] == 1
+
+
+def test_transient_errors_are_not_cached(clock):
+    cache = VerificationResultCache(ttl=60, max_entries=10)
+    compute, calls = counting({'verified': False, 'error': 'VERIFICATION_ERROR'})
+
+    cache.get_or_compute('key', compute)
+    cache.get_or_compute('key', compute)
+
+    assert len(calls) == 2 and cache.stats()['entries'] == 0
+
+
+def test_results_with_failed_photo_downloads_are_not_cached(clock):
+    cache = VerificationResultCache(ttl=60, max_entries=10)
+    compute, calls = counting({'verified': False, 'profile_photos_compared': 1, 'profile_photos_failed': 2})
+
+    cache.get_or_compute('key', compute)
+    cache.get_or_compute('key', compute)
+
+    assert len(calls) == 2 and cache.stats()['entries'] == 0
+
+
+def test_exceptions_propagate_and_are_not_cached(clock):
+    cache = VerificationResultCache(ttl=60, max_entries=10)
+
+    def failing():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_compute('key', failing)
+
+    assert cache.stats()['inflight'] == 0
+    assert cache.get_or_compute('key', lambda: {'verified': True}) == {'verified': True}
+
+
+def test_oldest_entry_is_evicted(clock):
+    cache = VerificationResultCache(ttl=60, max_entries=2)
+    for key in ('a', 'b', 'c'):
+        cache.get_or_compute(key, lambda: {'verified': True})
+    compute, calls = counting({'verified': True})
+
+    cache.get_or_compute('c', compute)
+    cache.get_or_compute('a', compute)
+
+    assert len(calls) == 1 and cache.stats()['entries'] == 2
+
+
+def test_concurrent_requests_are_coalesced():
+    cache = VerificationResultCache(ttl=60, max_entries=10)
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def slow():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return {'verified': True}
+
+    results = []
+    owner = threading.Thread(target=lambda: results.append(cache.get_or_compute('key', slow)))
+    owner.start()
+    started.wait(5)
+
+    waiter = threading.Thread(target=lambda: results.append(cache.get_or_compute('key', slow)))
+    waiter.start()
+    deadline = time.monotonic() + 5
+    while cache.stats()['coalesced'] == 0 and time.monotonic() < deadline:
+        time.sleep(0.001)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+
+    assert len(calls) == 1
+    assert results == [{'verified': True}, {'verified': True}]
+    assert cache.stats()['coalesced'] == 1
+
+
+def test_selfie_digest_ignores_data_url_prefix():
+    encoded = base64.b64encode(b'selfie-bytes').decode()
+
+    assert selfie_digest(f'data:image/jpeg;base64,{encoded}') == selfie_digest(encoded)
+    assert selfie_digest('not base64!') is None